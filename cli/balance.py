@@ -8,53 +8,20 @@
  */
 """
 
-import json
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
 from wallet import BitsCoinWallet
+from storage import read_chain, DEFAULT_DIR
+import ledger
 
-def compute_balance(chain_file, address):
-    """Oblicza saldo dla podanego adresu"""
-    try:
-        with open(chain_file) as f:
-            chain = json.load(f)
-    except FileNotFoundError:
+def compute_balances(chain_file, addresses):
+    """Salda wielu adresów jednym skanem (katalog bloków albo chain.json)"""
+    if not os.path.exists(chain_file):
         print(f"Chain file {chain_file} not found!")
-        return 0
+        return {address: 0 for address in addresses}
     
-    balance = 0
-    
-    # Sprawdź nagrody za mining
-    for blk in chain:
-        data = blk.get("data", "")
-        if f"Reward to {address}" in data:
-            try:
-                # Format: "Reward to address: 50 BSC"
-                parts = data.split(":")
-                if len(parts) > 1:
-                    reward_part = parts[-1].strip()
-                    reward = float(reward_part.split()[0])
-                    balance += reward
-            except:
-                pass
-        
-        # Sprawdź transakcje (format: TX {'from': 'addr1', 'to': 'addr2', 'amount': 10})
-        if "TX {" in data:
-            try:
-                # Wyciągnij część transakcji
-                tx_start = data.find("TX {")
-                tx_part = data[tx_start+3:]
-                tx_dict = eval(tx_part.split("}")[0] + "}")
-                
-                if tx_dict.get("to") == address:
-                    balance += float(tx_dict.get("amount", 0))
-                elif tx_dict.get("from") == address:
-                    balance -= float(tx_dict.get("amount", 0))
-            except:
-                pass
-    
-    return balance
+    return ledger.compute_balances(read_chain(chain_file), addresses)
 
 def list_wallet_addresses():
     """Wyświetla wszystkie adresy z portfela"""
@@ -71,31 +38,38 @@ def list_wallet_addresses():
     print()
 
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
+    args = sys.argv[1:]
+    if not args:
         # Bez argumentów - pokaż wszystkie adresy z portfela
         list_wallet_addresses()
         sys.exit(0)
     
-    elif len(sys.argv) == 2:
-        if sys.argv[1] == "--help":
-            print("Usage:")
-            print("  balance.py                    - List all wallet addresses")
-            print("  balance.py <address>          - Check balance for address")
-            print("  balance.py <chain.json> <address> - Check balance using specific chain file")
-            sys.exit(0)
-        else:
-            # Jeden argument - sprawdź saldo dla adresu z domyślnym chain.json
-            chain_file = "../core/chain.json"
-            address = sys.argv[1]
+    if args[0] == "--help":
+        print("Usage:")
+        print("  balance.py                    - List all wallet addresses")
+        print("  balance.py <address>...       - Check balances for one or more addresses")
+        print("  balance.py --all-wallet       - Check balances for every wallet address")
+        print("  balance.py <blocks_dir|chain.json> <address>...|--all-wallet")
+        print("                                - Use specific block store or chain file")
+        sys.exit(0)
     
-    elif len(sys.argv) == 3:
-        # Dwa argumenty - plik chain i adres
-        chain_file, address = sys.argv[1], sys.argv[2]
+    # Pierwszy argument to magazyn bloków/chain.json, jeśli istnieje na dysku
+    chain_file = DEFAULT_DIR
+    if os.path.exists(args[0]):
+        chain_file = args.pop(0)
     
-    else:
-        print("Usage: balance.py [chain.json] [address]")
+    addresses = [a for a in args if a != "--all-wallet"]
+    if "--all-wallet" in args:
+        addresses += [a for a in BitsCoinWallet().get_addresses() if a not in addresses]
+    
+    if not addresses:
+        print("Usage: balance.py [blocks_dir|chain.json] <address>...|--all-wallet")
         print("Run 'balance.py --help' for more info")
         sys.exit(1)
     
-    bal = compute_balance(chain_file, address)
-    print(f"Balance of {address}: {bal} BSC")
+    # Wszystkie salda z jednego przejścia po łańcuchu
+    balances = compute_balances(chain_file, addresses)
+    for address in addresses:
+        print(f"Balance of {address}: {balances[address]} BSC")
+    if len(addresses) > 1:
+        print(f"Total: {sum(balances.values())} BSC")
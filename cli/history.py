@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Historia Adresu
+ * Autorzy: Grupa Siedemtrzy
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from storage import BlockStore, DEFAULT_DIR
+
+def show_history(blocks_dir, address, cursor=None, limit=20):
+    """Wyświetla stronę historii adresu z indeksu magazynu bloków"""
+    if not os.path.isdir(blocks_dir):
+        print(f"❌ Error: {blocks_dir} is not a block store directory!")
+        return None
+    
+    store = BlockStore(blocks_dir, readonly=True)
+    try:
+        entries, next_cursor = store.history.page(address, cursor, limit)
+        if not entries:
+            print(f"No history for {address}")
+            return None
+        
+        print(f"\n=== History of {address} ===")
+        for height, position, delta in entries:
+            tx = store.get_by_height(height).transactions[position]
+            when = datetime.fromtimestamp(tx.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            kind = "reward" if tx.is_coinbase else "tx"
+            print(f"#{height:<8} {when}  {delta:+14.8f} BSC  {kind:<6} {tx.txid}")
+        
+        if next_cursor is not None:
+            print(f"\nMore: history.py {blocks_dir} {address} --cursor {next_cursor}")
+        return next_cursor
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    cursor, limit = None, 20
+    try:
+        if "--cursor" in args:
+            i = args.index("--cursor")
+            cursor = int(args[i + 1])
+            del args[i:i + 2]
+        if "--limit" in args:
+            i = args.index("--limit")
+            limit = int(args[i + 1])
+            del args[i:i + 2]
+    except (IndexError, ValueError):
+        args = []
+    
+    if len(args) == 1:
+        blocks_dir, address = DEFAULT_DIR, args[0]
+    elif len(args) == 2:
+        blocks_dir, address = args
+    else:
+        print("Usage: history.py [blocks_dir] <address> [--cursor N] [--limit N]")
+        sys.exit(1)
+    
+    try:
+        show_history(blocks_dir, address, cursor, limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
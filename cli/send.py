@@ -8,54 +8,30 @@
  */
 """
 
-import json
 import sys
 import time
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
 from wallet import BitsCoinWallet
+from storage import BlockStore, read_chain
+from transaction import Transaction
+import ledger
 
 def get_balance(chain_file, address):
     """Pobiera aktuelle saldo adresu"""
-    try:
-        with open(chain_file) as f:
-            chain = json.load(f)
-    except FileNotFoundError:
+    if not os.path.exists(chain_file):
         return 0
     
-    balance = 0
-    for blk in chain:
-        data = blk.get("data", "")
-        
-        # Nagrody za mining
-        if f"Reward to {address}" in data:
-            try:
-                parts = data.split(":")
-                if len(parts) > 1:
-                    reward = float(parts[-1].strip().split()[0])
-                    balance += reward
-            except:
-                pass
-        
-        # Transakcje
-        if "TX {" in data:
-            try:
-                tx_start = data.find("TX {")
-                tx_part = data[tx_start+3:]
-                tx_dict = eval(tx_part.split("}")[0] + "}")
-                
-                if tx_dict.get("to") == address:
-                    balance += float(tx_dict.get("amount", 0))
-                elif tx_dict.get("from") == address:
-                    balance -= float(tx_dict.get("amount", 0))
-            except:
-                pass
-    
-    return balance
+    return ledger.compute_balances(read_chain(chain_file), [address])[address]
 
-def send_transaction(chain_file, from_addr, to_addr, amount):
+def send_transaction(chain_file, from_addr, to_addr, amount, fee=0):
     """Wysyła bezpieczną transakcję z weryfikacją"""
     
+    if not os.path.isdir(chain_file):
+        print(f"❌ Error: {chain_file} is not a block store directory!")
+        print("   chain.json is only an export - pass the node's blocks directory")
+        return False
+    
     # 1. Sprawdź czy portfel zawiera adres nadawcy
     wallet = BitsCoinWallet()
     if from_addr not in wallet.get_addresses():
@@ -64,10 +40,10 @@ def send_transaction(chain_file, from_addr, to_addr, amount):
     
     # 2. Sprawdź saldo
     balance = get_balance(chain_file, from_addr)
-    if balance < amount:
+    if balance < amount + fee:
         print(f"❌ Insufficient funds!")
         print(f"   Balance: {balance} BSC")
-        print(f"   Required: {amount} BSC")
+        print(f"   Required: {amount + fee} BSC")
         return False
     
     # 3. Utwórz transakcję
@@ -75,33 +51,27 @@ def send_transaction(chain_file, from_addr, to_addr, amount):
         "from": from_addr,
         "to": to_addr,
         "amount": float(amount),
+        "fee": float(fee),
         "timestamp": time.time()
     }
     
     # 4. Podpisz transakcję
-    tx_message = f"{from_addr}->{to_addr}:{amount}"
+    # Klucz publiczny w transakcji - węzeł weryfikuje podpis bez portfela
+    tx_data["public_key"] = wallet.export_public_key(from_addr)
+    tx_message = Transaction.from_dict(tx_data).message()
     signature = wallet.sign_transaction(from_addr, tx_message)
     tx_data["signature"] = signature
     
-    # 5. Dodaj do blockchain
+    # 5. Przekaż do node'a - trafi do następnego wykopanego bloku
     try:
-        with open(chain_file) as f:
-            chain = json.load(f)
-        
-        # Dodaj transakcję do ostatniego bloku
-        if len(chain) > 0:
-            current_data = chain[-1].get("data", "")
-            chain[-1]["data"] = f"{current_data} | TX {tx_data}"
-        
-        # Zapisz zaktualizowany blockchain
-        with open(chain_file, "w") as f:
-            json.dump(chain, f, indent=2)
+        BlockStore(chain_file, readonly=True).submit_transaction(tx_data)
         
         print("✅ Transaction sent successfully!")
         print(f"   From: {from_addr}")
         print(f"   To: {to_addr}")
         print(f"   Amount: {amount} BSC")
-        print(f"   New balance: {balance - amount} BSC")
+        print(f"   Fee: {fee} BSC")
+        print(f"   New balance: {balance - amount - fee} BSC")
         return True
         
     except Exception as e:
@@ -109,21 +79,23 @@ def send_transaction(chain_file, from_addr, to_addr, amount):
         return False
 
 if __name__ == "__main__":
-    if len(sys.argv) != 5:
-        print("Usage: send.py <chain.json> <from_address> <to_address> <amount>")
+    if len(sys.argv) not in (5, 6):
+        print("Usage: send.py <blocks_dir> <from_address> <to_address> <amount> [fee]")
         print("\nExample:")
-        print("  send.py ../core/chain.json TccHgF... Tovd4e... 10.5")
+        print("  send.py ../core/blocks TccHgF... Tovd4e... 10.5 0.01")
         sys.exit(1)
     
-    chain_file, from_addr, to_addr, amount_str = sys.argv[1:]
+    chain_file, from_addr, to_addr, amount_str = sys.argv[1:5]
+    fee_str = sys.argv[5] if len(sys.argv) == 6 else "0"
     
     try:
         amount = float(amount_str)
-        if amount <= 0:
-            print("❌ Amount must be positive!")
+        fee = float(fee_str)
+        if amount <= 0 or fee < 0:
+            print("❌ Amount must be positive and fee non-negative!")
             sys.exit(1)
     except ValueError:
         print("❌ Invalid amount format!")
         sys.exit(1)
     
-    send_transaction(chain_file, from_addr, to_addr, amount)
+    send_transaction(chain_file, from_addr, to_addr, amount, fee)
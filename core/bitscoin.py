@@ -9,54 +9,353 @@
  */
 """
 
-import hashlib, time, json, threading
+import hashlib, time, threading
 from wallet import BitsCoinWallet
+from mining import MiningEngine, MiningJob
+from retarget import DifficultyRetargeter
+from storage import BlockStore, DEFAULT_DIR
+from validation import validate_store
+from ledger import Ledger, compute_balances
+from transaction import Transaction, legacy_transactions
+from utxo import UtxoSet
+from mempool import Mempool, EXPIRY
+from template import TemplateBuilder
+from merkle import MerkleTree, merkle_root
+from signatures import SignatureVerifier
+import header
+
+_RECORD = header.BLOCK_RECORD
+# Dopuszczalne wyprzedzenie zegara nadawcy dla timestampu transakcji (s)
+CLOCK_SKEW = 600
 
 class Block:
-    def __init__(self, index, prev_hash, timestamp, data, nonce=0):
-        self.index = index
-        self.previous_hash = prev_hash
-        self.timestamp = timestamp
-        self.data = data
-        self.nonce = nonce
-        self.hash = self.compute_hash()
+    """Blok łańcucha - niemutowalny, trzymany jako jeden kanoniczny rekord.
 
-    def compute_hash(self):
-        s = json.dumps({
-            "index": self.index,
-            "previous_hash": self.previous_hash,
-            "timestamp": self.timestamp,
+    Pola są dekodowane z rekordu przy odczycie, hashe siedzą w nim jako
+    32 bajty, a serialize() zwraca rekord bez kopiowania. Od wersji 4
+    treść to data i lista transakcji, każde z prefiksem długości; od
+    wersji 5 poprzedza je korzeń Merkle txidów.
+    """
+    __slots__ = ("_raw",)
+
+    def __init__(self, index, prev_hash, timestamp, data, nonce=0,
+                 version=header.HEADER_VERSION, bits=0, hash=None, transactions=(),
+                 tx_bytes=b""):
+        if isinstance(prev_hash, str):
+            prev_hash = header.hash_to_bytes(prev_hash)
+        body = data.encode()
+        # Bloki bez pola version (stary chain.json) to LEGACY_VERSION,
+        # bits to kompaktowy target PoW (od wersji 3 nagłówka);
+        # tx_bytes - gotowe transakcje z prefiksami (szablon bloku) za transactions
+        if version >= header.TX_VERSION:
+            parts = [header.LENGTH.pack(len(body)), body]
+            for tx in transactions:
+                encoded = tx.encode()
+                parts += (header.LENGTH.pack(len(encoded)), encoded)
+            parts.append(tx_bytes)
+            if version >= header.MERKLE_VERSION:
+                leaves = [bytes.fromhex(tx.txid) for tx in transactions]
+                leaves += [hashlib.sha256(p).digest() for p in header.body_parts(tx_bytes)]
+                parts.insert(0, merkle_root(leaves))
+            body = b"".join(parts)
+        elif transactions or tx_bytes:
+            raise ValueError(f"Block version {version} cannot hold transactions")
+        if hash is None:
+            hash = header.block_digest(version, index, prev_hash, timestamp,
+                                       body, bits, nonce)
+        elif isinstance(hash, str):
+            hash = header.hash_to_bytes(hash)
+        object.__setattr__(self, "_raw", _RECORD.pack(
+            version, index, prev_hash, timestamp, bits, nonce, hash) + body)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Block is immutable (cannot set {name})")
+
+    def __reduce__(self):
+        return (Block.from_bytes, (bytes(self._raw),))
+
+    @classmethod
+    def from_bytes(cls, raw):
+        """Blok z kanonicznego rekordu (bez przeliczania hasha)"""
+        return cls.from_buffer(bytes(raw))
+
+    @classmethod
+    def from_buffer(cls, view):
+        """Blok bez kopiowania - pola dekodowane z bufora (np. mmap) przy odczycie"""
+        blk = cls.__new__(cls)
+        object.__setattr__(blk, "_raw", view)
+        return blk
+
+    def serialize(self):
+        """Kanoniczny rekord bloku (bytes albo memoryview dla from_buffer)"""
+        return self._raw
+
+    @classmethod
+    def from_dict(cls, d):
+        """Blok ze słownika chain.json; zapisany hash zostaje bez zmian"""
+        return cls(d["index"], d["previous_hash"], d["timestamp"], d["data"],
+                   d.get("nonce", 0), d.get("version", header.LEGACY_VERSION),
+                   d.get("bits", 0), d.get("hash"),
+                   [Transaction.from_dict(tx) for tx in d.get("transactions", ())])
+
+    def to_dict(self):
+        """Słownik w formacie chain.json"""
+        version, index, prev, timestamp, bits, nonce, hash = _RECORD.unpack_from(self._raw)
+        d = {
+            "index": index,
+            "previous_hash": header.bytes_to_hash(prev),
+            "timestamp": timestamp,
             "data": self.data,
-            "nonce": self.nonce
-        }, sort_keys=True).encode()
-        return hashlib.sha256(s).hexdigest()
+            "nonce": nonce,
+            "version": version,
+            "bits": bits,
+            "hash": hash.hex()
+        }
+        # Stare bloki trzymają transakcje w data - eksport bez zmian bajtów
+        if version >= header.TX_VERSION:
+            d["transactions"] = [tx.to_dict() for tx in self.transactions]
+        return d
+
+    def with_nonce(self, nonce):
+        """Ten sam nagłówek z innym nonce'em (nowy blok, hash przeliczony)"""
+        version, index, prev, timestamp, bits, _, _ = _RECORD.unpack_from(self._raw)
+        body = bytes(self._raw[_RECORD.size:])
+        hash = header.block_digest(version, index, prev, timestamp, body, bits, nonce)
+        return Block.from_bytes(_RECORD.pack(
+            version, index, prev, timestamp, bits, nonce, hash) + body)
+
+    def _field(i):
+        return property(lambda self: _RECORD.unpack_from(self._raw)[i])
+
+    version = _field(0)
+    index = _field(1)
+    prev_hash_bytes = _field(2)
+    timestamp = _field(3)
+    bits = _field(4)
+    nonce = _field(5)
+    hash_bytes = _field(6)
+    del _field
+
+    def _parts(self):
+        """Fragmenty treści: data, potem zakodowane transakcje (wersje 4+)"""
+        start = _RECORD.size + (32 if self.version >= header.MERKLE_VERSION else 0)
+        return header.body_parts(self._raw, start)
+
+    @property
+    def data(self):
+        if self.version < header.TX_VERSION:
+            return str(self._raw[_RECORD.size:], "utf-8")
+        return str(next(self._parts()), "utf-8")
+
+    @property
+    def transactions(self):
+        """Lista transakcji (coinbase pierwsza); stare bloki - migrowane z data"""
+        if self.version < header.TX_VERSION:
+            return legacy_transactions(self.data, self.timestamp)
+        parts = self._parts()
+        next(parts)
+        return [Transaction.decode(raw) for raw in parts]
+
+    @property
+    def merkle_root(self):
+        """Korzeń Merkle z nagłówka (None przed wersją 5)"""
+        if self.version < header.MERKLE_VERSION:
+            return None
+        return bytes(self._raw[_RECORD.size:_RECORD.size + 32])
+
+    def merkle_tree(self):
+        """Drzewo Merkle txidów bloku - źródło dowodów przynależności"""
+        parts = self._parts()
+        next(parts)
+        return MerkleTree(hashlib.sha256(raw).digest() for raw in parts)
+
+    @property
+    def previous_hash(self):
+        return header.bytes_to_hash(self.prev_hash_bytes)
+
+    @property
+    def hash(self):
+        return self.hash_bytes.hex()
+
+    def header_prefix(self):
+        """Nagłówek bez nonce'a - hashowany raz na blok"""
+        return header.encode_prefix(self.version, self.index, self.prev_hash_bytes,
+                                    self.timestamp, self._raw[_RECORD.size:], self.bits)
+
+    def midstate(self):
+        return header.midstate(self.header_prefix())
+
+    def compute_hash(self):
+        """Przelicza hash z pól (do weryfikacji zapisanego hasha)"""
+        return header.record_digest(self._raw).hex()
 
 class Blockchain:
-    def __init__(self, difficulty=4, reward=50):
-        self.chain = [self.create_genesis_block()]
+    def __init__(self, difficulty=4, reward=50, workers=None,
+                 block_time=None, retarget_window=30, store=None, validate=False):
+        # store (BlockStore) - bloki dopisywane do logu, łańcuch wczytywany z dysku
+        self.store = store
+        # validate - sprawdź hashe, ciągłość i PoW wczytanego łańcucha (pula procesów);
+        # łańcuch z błędnym blokiem jest wczytywany tylko do niego i nie jest kopany
+        self.validation = None
+        if store is not None and len(store):
+            self.chain = list(store)
+            if validate:
+                self.validation = validate_store(store, workers)
+                if not self.validation.valid:
+                    height = self.validation.invalid_height
+                    if not height:
+                        raise ValueError(f"Block store {store.directory} is invalid "
+                                         f"from genesis: {self.validation.reason}")
+                    print(f"⚠️  Invalid block at height {height}: "
+                          f"{self.validation.reason} - chain loaded up to it, mining disabled")
+                    del self.chain[height:]
+        else:
+            self.chain = [self.create_genesis_block()]
+            if store is not None:
+                store.append(self.chain[0])
         self.difficulty = difficulty
         self.reward = reward
+        # Salda aktualizowane przy każdym bloku - odczyt O(1)
+        self.ledger = Ledger()
+        for blk in self.chain:
+            self.ledger.apply_block(blk)
+        # Niewydane wyjścia - zrzut z katalogu magazynu, doganiany do tipu
+        self.utxo = UtxoSet(store.directory if store is not None else None)
+        self.utxo.sync(self.chain)
         self.wallet = BitsCoinWallet()
+        self.miner = MiningEngine(workers)
+        # Podpisy transakcji sprawdzane wsadowo na puli procesów
+        self.verifier = SignatureVerifier(workers)
+        self.last_mining_result = None
+        self.current_job = None
+        self.mining = threading.Event()
+        # Licznik zatrzymań - token miningu sprzed stopu anuluje każde nowe zadanie
+        self._stops = 0
+        self._job_lock = threading.Lock()
+        # Transakcje czekające na następny blok, po opłacie za bajt;
+        # mempool.spends to wyjścia zarezerwowane przez oczekujące transakcje;
+        # templates trzyma gotowy szablon następnego bloku w budżecie bajtów
+        self.templates = TemplateBuilder()
+        self.mempool = Mempool(listener=self.templates)
+        # Podpisane treści z okna ważności: signed_id -> (timestamp, txid);
+        # ta sama treść z innym txid to powtórzenie (replay)
+        self.signed = {}
+        for blk in reversed(self.chain):
+            if blk.timestamp < self.last_block().timestamp - EXPIRY:
+                break
+            self._record_signed(blk.transactions)
+        self._lock = threading.RLock()
+        # block_time=None - stała difficulty, inaczej retarget co blok
+        self.retargeter = None
+        if block_time:
+            self.retargeter = DifficultyRetargeter(block_time, retarget_window)
+            # Odtwórz okno z ostatnich bloków wczytanego łańcucha: window+1
+            # timestampów, pierwszy (genesis tylko w krótkim łańcuchu) bez targetu
+            start = max(1, len(self.chain) - retarget_window)
+            self.retargeter.observe(self.chain[start - 1].timestamp)
+            for blk in self.chain[start:]:
+                self.retarget(blk)
 
     def create_genesis_block(self):
         # Genesis block z premine
-        genesis = Block(0, "0", time.time(), "Genesis Block: BitsCoin 2025 Launch", 0)
-        genesis.hash = genesis.compute_hash()
-        return genesis
+        return Block(0, "0", time.time(), "Genesis Block: BitsCoin 2025 Launch", 0)
 
     def last_block(self): 
         return self.chain[-1]
 
+    @property
+    def target(self):
+        """Target PoW dla aktualnej difficulty (zaokrąglony do bits, najwyżej MAX_POW_TARGET)"""
+        target = min(header.MAX_POW_TARGET, header.difficulty_to_target(self.difficulty))
+        return header.bits_to_target(header.target_to_bits(target))
+
+    @property
+    def extendable(self):
+        """Czy można dopisywać bloki - nie za błędnym blokiem zostawionym w magazynie"""
+        return self.validation is None or self.validation.valid
+
+    def _check_extendable(self):
+        if not self.extendable:
+            raise ValueError(f"Chain is invalid at height {self.validation.invalid_height} "
+                             f"({self.validation.reason}) - refusing to extend it")
+
+    def mining_token(self):
+        """Token do add_block/mine_block - traci ważność przy cancel_mining"""
+        return self._stops
+
+    def mining_cancelled(self, token):
+        """Czy od pobrania tokenu był stop - pętla miningu z takim tokenem kończy się"""
+        return token != self._stops
+
+    def mine_block(self, block, token=None):
+        """Kopie blok jako anulowalne zadanie, zwraca MiningResult.
+
+        Stop zgłoszony po pobraniu tokenu (np. w trakcie budowania bloku)
+        anuluje zadanie od razu, zanim ruszy PoW; takie zadanie nie staje się
+        current_job, więc nie przesłoni zadania nowej pętli miningu.
+        """
+        job = MiningJob(block, header.bits_to_target(block.bits))
+        with self._job_lock:
+            if token is not None and self.mining_cancelled(token):
+                job.cancel()
+            else:
+                self.current_job = job
+        result = self.miner.run(job)
+        self.last_mining_result = result
+        return result
+
     def proof_of_work(self, block):
-        target = "0" * self.difficulty
-        start = time.time()
-        while not block.hash.startswith(target):
-            block.nonce += 1
-            block.hash = block.compute_hash()
-        return time.time() - start
-
-    def add_block(self, miner_address=""):
-        """Dodaje nowy blok z nagrodą dla prawdziwego adresu"""
+        """Kopie blok na wszystkich rdzeniach, zwraca czas w sekundach"""
+        return self.mine_block(block).elapsed
+
+    def cancel_mining(self):
+        """Przerywa bieżące i przygotowywane zadanie miningu (w ciągu jednej paczki nonce'ów)"""
+        with self._job_lock:
+            self._stops += 1
+            job = self.current_job
+        if job is not None:
+            job.cancel()
+
+    def append_block(self, blk):
+        """Dołącza blok na szczyt łańcucha i przerywa kopanie na starym tipie"""
+        with self._lock:
+            if blk.previous_hash != self.last_block().hash or not self.extendable:
+                return False
+            if not all(self.verifier.verify_block(blk)):
+                print(f"Rejected block #{blk.index}: invalid transaction signature")
+                return False
+            try:
+                for tx in blk.transactions:
+                    if not tx.is_coinbase:
+                        self._check_signed(tx, blk.timestamp)
+                self.utxo.connect_block(blk)
+            except ValueError as e:
+                print(f"Rejected block #{blk.index}: {e}")
+                return False
+            self._record_signed(blk.transactions)
+            self._prune_signed(blk.timestamp)
+            if self.store is not None:
+                self.store.append(blk)
+            self.chain.append(blk)
+            self.ledger.apply_block(blk)
+            self.retarget(blk)
+            # Zdejmij dołączone transakcje i te, których wejścia blok już wydał
+            self.mempool.remove_block(blk)
+        job = self.current_job
+        if job is not None and job.block.previous_hash != blk.hash:
+            job.cancel()
+        return True
+
+    def add_block(self, miner_address="", token=None):
+        """Dodaje nowy blok z nagrodą dla prawdziwego adresu.
+
+        token z mining_token() pobrany przed pętlą miningu - stop w trakcie
+        przygotowania bloku przerwie też to zadanie. ValueError na łańcuchu,
+        którego walidacja znalazła błędny blok.
+        """
+        self._check_extendable()
+        if token is None:
+            token = self.mining_token()
         prev = self.last_block()
         
         # Jeśli nie podano adresu, użyj pierwszego z portfela
@@ -67,59 +366,181 @@ class Blockchain:
             else:
                 miner_address = "unknown_miner"
         
-        blk = Block(prev.index+1, prev.hash, time.time(),
-                    f"Reward to {miner_address}: {self.reward} BSC")
-        t = self.proof_of_work(blk)
-        self.chain.append(blk)
-        return blk, round(t, 2)
+        data = f"Reward to {miner_address}: {self.reward} BSC"
+        if self.store is not None:
+            # Transakcje wysłane z CLI przez dziennik magazynu - podpisy jednym wsadem
+            journal = []
+            for tx in self.store.take_transactions():
+                try:
+                    journal.append(Transaction.from_dict(tx))
+                except (ValueError, TypeError, AttributeError) as e:
+                    print(f"Rejected transaction from journal: {e}")
+            for tx, ok in zip(journal, self.verifier.verify(journal)):
+                try:
+                    if not ok:
+                        raise ValueError(f"Invalid signature on {tx.txid}")
+                    self.verifier.remember(self._submit(tx))
+                except ValueError as e:
+                    print(f"Rejected transaction from journal: {e}")
+        timestamp = time.time()
+        with self._lock:
+            self.mempool.expire(timestamp)
+            # Coinbase (nagroda + opłaty) pierwsza, za nią zakodowane transakcje szablonu
+            template = self.templates.template()
+        coinbase = Transaction.coinbase(miner_address, self.reward + template.fees, timestamp)
+        blk = Block(prev.index+1, prev.hash, timestamp, data,
+                    bits=header.target_to_bits(self.target),
+                    transactions=[coinbase], tx_bytes=template.tx_bytes)
+        result = self.mine_block(blk, token)
+        # Przerwane albo wyprzedzone przez nowy tip - wołający kopie od nowa
+        if result.cancelled:
+            return None, round(result.elapsed, 2)
+        blk = result.block
+        if not self.append_block(blk):
+            self.miner.stats.discard(result)
+            return None, round(result.elapsed, 2)
+        return blk, round(result.elapsed, 2)
+
+    def submit_transaction(self, tx):
+        """Kolejkuje transakcję (Transaction albo słownik) do następnego bloku.
+
+        Bez inputs węzeł wybiera najstarsze niezarezerwowane wyjścia nadawcy.
+        Wejścia są rezerwowane w mempoolu pod blokadą, więc dwie równoległe
+        wysyłki nie wydadzą tych samych monet - druga dostaje ValueError,
+        tak jak transakcja z za niską opłatą przy pełnym mempoolu. Podpis
+        musi się zgadzać z kluczem public_key należącym do nadawcy.
+        """
+        if not isinstance(tx, Transaction):
+            tx = Transaction.from_dict(tx)
+        if not tx.is_coinbase and not self.verifier.verify([tx])[0]:
+            raise ValueError(f"Invalid signature on {tx.txid}")
+        tx = self._submit(tx)
+        # Blok z tą transakcją nie zweryfikuje jej podpisu drugi raz
+        self.verifier.remember(tx)
+        return tx
+
+    def _check_signed(self, tx, now):
+        """ValueError dla transakcji spoza okna ważności albo powtórzonej"""
+        if not now - EXPIRY <= tx.timestamp <= now + CLOCK_SKEW:
+            raise ValueError(f"Transaction {tx.txid} timestamp outside the validity window")
+        seen = self.signed.get(tx.signed_id)
+        if seen is not None and seen[1] != tx.txid:
+            raise ValueError(f"Transaction {tx.txid} replays {seen[1]}")
+
+    def _record_signed(self, transactions):
+        for tx in transactions:
+            if not tx.is_coinbase:
+                self.signed[tx.signed_id] = (tx.timestamp, tx.txid)
+
+    def _prune_signed(self, now):
+        """Zapomina treści starsze niż okno - i tak nie przejdą _check_signed"""
+        cutoff = now - EXPIRY
+        self.signed = {k: v for k, v in self.signed.items() if v[0] >= cutoff}
+
+    def _submit(self, tx):
+        """Kolejkuje transakcję z już sprawdzonym podpisem"""
+        if tx.is_coinbase:
+            raise ValueError("Coinbase transactions cannot be submitted")
+        if tx.amount <= 0 or tx.fee < 0:
+            raise ValueError("Amount must be positive and fee non-negative")
+        with self._lock:
+            now = time.time()
+            self.mempool.expire(now)
+            self._check_signed(tx, now)
+            if not tx.inputs:
+                inputs, total = self.utxo.select(tx.sender, tx.cost, self.mempool.spends)
+                if total < tx.cost:
+                    raise ValueError(f"Insufficient funds: {total} of {tx.cost} BSC")
+                tx = tx.with_inputs(inputs)
+            self.utxo.check(tx, self.mempool.spends)
+            # Wygasa wg podpisanego timestampu, jeśli ten jest starszy niż
+            # przyjęcie - inaczej szablon trzymałby transakcję, którą
+            # _check_signed odrzuci w każdym wykopanym bloku
+            self.mempool.add(tx, now=min(now, tx.timestamp))
+            self._record_signed([tx])
+        return tx
+
+    @property
+    def pending_transactions(self):
+        """Oczekujące transakcje od najwyższej opłaty za bajt"""
+        with self._lock:
+            return self.mempool.select()
+
+    def spendable(self, address):
+        """Niewydane i niezarezerwowane środki adresu"""
+        with self._lock:
+            return self.utxo.balance(address, self.mempool.spends)
+
+    def mining_stats(self):
+        """Telemetria miningu: H/s, nonce'y na blok, percentyle czasu, stale ratio"""
+        return self.miner.stats.snapshot()
+
+    def signature_stats(self):
+        """Cache weryfikacji podpisów: rozmiar, trafienia, chybienia"""
+        return self.verifier.cache.stats()
+
+    def retarget(self, blk):
+        """Przelicza difficulty po dodaniu bloku (O(1) - okno przesuwne)"""
+        if self.retargeter is None:
+            return
+        # Bloki sprzed wersji 3 nie mają bits - liczą się z bieżącym targetem
+        target = header.bits_to_target(blk.bits) if blk.bits else self.target
+        self.retargeter.observe(blk.timestamp, target)
+        target = self.retargeter.next_target(self.target)
+        self.difficulty = header.target_to_difficulty(target)
 
     def start_mining(self, miner_address=""):
-        """Uruchamia mining na określony adres"""
+        """Uruchamia mining na określony adres (ValueError na błędnym łańcuchu)"""
+        self._check_extendable()
+        token = self.mining_token()
         def mine():
-            while True:
-                blk, t = self.add_block(miner_address)
+            # Po stop_mining + start_mining stary wątek ma nieważny token - kończy się
+            while self.mining.is_set() and not self.mining_cancelled(token):
+                blk, t = self.add_block(miner_address, token)
+                if blk is None:
+                    continue
                 print(f"⛏️  Mined block #{blk.index} in {t}s")
+                print(f"   Hashes: {self.last_mining_result.total_hashes} ({self.miner.workers} workers)")
                 print(f"   Reward: {self.reward} BSC -> {miner_address}")
                 print(f"   Hash: {blk.hash}")
                 print()
+        self.mining.set()
         threading.Thread(target=mine, daemon=True).start()
 
+    def stop_mining(self):
+        """Zatrzymuje wątek start_mining bez czekania na koniec PoW"""
+        self.mining.clear()
+        self.cancel_mining()
+
+    def balance(self, address):
+        """Saldo adresu z księgi (O(1))"""
+        with self._lock:
+            return self.ledger.balance(address)
+
     def get_balance(self, address):
-        """Oblicza saldo dla adresu"""
-        balance = 0
-        for blk in self.chain[1:]:  # Pomiń genesis
-            data = blk.data
-            if f"Reward to {address}" in data:
-                balance += self.reward
-            # Dodaj obsługę transakcji
-            if "TX {" in data:
-                try:
-                    tx_start = data.find("TX {")
-                    tx_part = data[tx_start+3:]
-                    tx_dict = eval(tx_part.split("}")[0] + "}")
-                    
-                    if tx_dict.get("to") == address:
-                        balance += float(tx_dict.get("amount", 0))
-                    elif tx_dict.get("from") == address:
-                        balance -= float(tx_dict.get("amount", 0))
-                except:
-                    pass
-        return balance
+        """Oblicza saldo dla adresu pełnym skanem łańcucha (weryfikacja księgi)"""
+        return compute_balances(self.chain, [address])[address]
 
     def show_status(self):
         """Pokaż status blockchain i sald"""
         print(f"\n=== BitsCoin Blockchain Status ===")
         print(f"Blocks: {len(self.chain)}")
-        print(f"Difficulty: {self.difficulty}")
+        print(f"Difficulty: {self.difficulty:.4f}")
+        print(f"Mining workers: {self.miner.workers}")
+        print(f"Hashrate: {self.mining_stats()['hashrate']:.0f} H/s")
         print(f"Block Reward: {self.reward} BSC")
         
         print(f"\n=== Wallet Balances ===")
         for addr in self.wallet.get_addresses():
-            balance = self.get_balance(addr)
+            balance = self.balance(addr)
             print(f"{addr}: {balance} BSC")
 
 if __name__=="__main__":
-    bc = Blockchain(difficulty=4)
+    bc = Blockchain(difficulty=4, block_time=10, store=BlockStore(DEFAULT_DIR),
+                    validate=True)
+    if not bc.extendable:
+        bc.show_status()
+        raise SystemExit(f"Chain is invalid: {bc.validation} - not mining")
     
     # Sprawdź czy mamy adresy w portfelu
     if not bc.wallet.get_addresses():
@@ -138,10 +559,10 @@ if __name__=="__main__":
             time.sleep(5)
             bc.show_status()
     except KeyboardInterrupt:
+        bc.stop_mining()
         print(f"\nMining stopped!")
         bc.show_status()
         
-        # Zapisz blockchain
-        with open("chain.json","w") as f:
-            json.dump([b.__dict__ for b in bc.chain], f, indent=2)
-        print("Blockchain saved to chain.json")
+        # Bloki są już w magazynie - chain.json to tylko eksport
+        bc.store.export_json("chain.json")
+        print(f"Blockchain stored in {DEFAULT_DIR}, exported to chain.json")
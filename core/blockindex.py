@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Indeksy Magazynu Bloków
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import hashlib, os, struct
+
+class HeightIndex:
+    """Wysokość -> (segment, offset): rekordy stałej długości, odczyt O(1)"""
+    ENTRY = struct.Struct("<IQ")
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._fd = None
+        if not readonly:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            # Urwany wpis po awarii - zostaw tylko pełne rekordy
+            size = os.fstat(self._fd).st_size
+            os.ftruncate(self._fd, size - size % self.ENTRY.size)
+            os.lseek(self._fd, 0, os.SEEK_END)
+
+    def _open(self):
+        # Czytelnik otwiera plik leniwie - node mógł go jeszcze nie utworzyć
+        if self._fd is None and os.path.exists(self.path):
+            self._fd = os.open(self.path, os.O_RDONLY)
+        return self._fd
+
+    def __len__(self):
+        fd = self._open()
+        return 0 if fd is None else os.fstat(fd).st_size // self.ENTRY.size
+
+    def get(self, height):
+        """(segment, offset) rekordu bloku albo None poza zakresem"""
+        fd = self._open()
+        if fd is None or height < 0:
+            return None
+        raw = os.pread(fd, self.ENTRY.size, height * self.ENTRY.size)
+        if len(raw) < self.ENTRY.size:
+            return None
+        return self.ENTRY.unpack(raw)
+
+    def append(self, segment, offset):
+        os.write(self._fd, self.ENTRY.pack(segment, offset))
+
+    def truncate(self, count):
+        os.ftruncate(self._fd, count * self.ENTRY.size)
+        os.lseek(self._fd, 0, os.SEEK_END)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class HashIndex:
+    """Hash bloku -> wysokość: tablica z adresowaniem otwartym w pliku.
+
+    Slot to ostatnie 8 bajtów klucza modulo pojemność - początek hasha
+    bloku to zera wymuszone przez PoW, koniec jest losowy. Tablica podwaja
+    się przy zapełnieniu do połowy, a czytelnicy otwierają plik przy każdym
+    zapytaniu, więc widzą też nowszą tablicę po powiększeniu. Plik ze
+    starym magic (sloty z pierwszych bajtów) jest zakładany od nowa -
+    reset mówi właścicielowi, że trzeba go przebudować.
+    """
+    HEADER = struct.Struct("<4sQQ")
+    # hash, wysokość + 1 (0 = pusty slot)
+    SLOT = struct.Struct("<32sQ")
+    MAGIC = b"BSH2"
+
+    def __init__(self, path, readonly=False, capacity=1024):
+        self.path = path
+        self.readonly = readonly
+        self.reset = False
+        self._fd = None
+        if not readonly:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    self.reset = f.read(4) != self.MAGIC
+            if self.reset or not os.path.exists(path):
+                self._create(path, capacity)
+            self._fd = os.open(path, os.O_RDWR)
+            _, self.capacity, self.count = self._header(self._fd)
+
+    def _create(self, path, capacity):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, capacity, 0))
+            f.truncate(self.HEADER.size + capacity * self.SLOT.size)
+
+    def _header(self, fd):
+        return self.HEADER.unpack(os.pread(fd, self.HEADER.size, 0))
+
+    def _probe(self, fd, capacity, key):
+        """Slot z kluczem albo pierwszy pusty: (pozycja, wysokość+1)"""
+        i = int.from_bytes(key[-8:], "little") & (capacity - 1)
+        for _ in range(capacity):
+            pos = self.HEADER.size + i * self.SLOT.size
+            k, value = self.SLOT.unpack(os.pread(fd, self.SLOT.size, pos))
+            if value == 0 or k == key:
+                return pos, value
+            i = (i + 1) & (capacity - 1)
+        raise IOError(f"Hash index {self.path} is full")
+
+    def get(self, key):
+        fd = self._fd
+        if fd is None:
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+        try:
+            magic, capacity, _ = self._header(fd)
+            if magic != self.MAGIC:
+                return None
+            _, value = self._probe(fd, capacity, key)
+            return value - 1 if value else None
+        finally:
+            if fd is not self._fd:
+                os.close(fd)
+
+    def put(self, key, height):
+        if (self.count + 1) * 2 > self.capacity:
+            self._grow()
+        pos, value = self._probe(self._fd, self.capacity, key)
+        os.pwrite(self._fd, self.SLOT.pack(key, height + 1), pos)
+        if not value:
+            self.count += 1
+            os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, self.capacity, self.count), 0)
+
+    def _grow(self):
+        """Przepisuje tablicę do dwa razy większej i podmienia plik atomowo"""
+        tmp = self.path + ".tmp"
+        capacity = self.capacity * 2
+        self._create(tmp, capacity)
+        fd = os.open(tmp, os.O_RDWR)
+        try:
+            chunk = 4096
+            for start in range(0, self.capacity, chunk):
+                n = min(chunk, self.capacity - start)
+                raw = os.pread(self._fd, n * self.SLOT.size,
+                               self.HEADER.size + start * self.SLOT.size)
+                for key, value in self.SLOT.iter_unpack(raw):
+                    if value:
+                        pos, _ = self._probe(fd, capacity, key)
+                        os.pwrite(fd, self.SLOT.pack(key, value), pos)
+            os.pwrite(fd, self.HEADER.pack(self.MAGIC, capacity, self.count), 0)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.path)
+        os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR)
+        self.capacity = capacity
+
+    def clear(self):
+        """Pusta tablica (przed przebudową indeksu)"""
+        os.close(self._fd)
+        self._create(self.path, 1024)
+        self.reset = False
+        self._fd = os.open(self.path, os.O_RDWR)
+        _, self.capacity, self.count = self._header(self._fd)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class HistoryIndex:
+    """Adres -> historia: (wysokość, pozycja transakcji, zmiana salda).
+
+    Wpisy stałej długości są dopisywane na końcu pliku i każdy wskazuje
+    poprzedni wpis tego samego adresu; tablica HashIndex trzyma ostatni
+    wpis każdego adresu. Strona historii to kilka odczytów od głowy
+    listy, więc nie zależy od długości łańcucha. Nagłówek pliku (liczba
+    bloków i wpisów) jest zapisywany jako ostatni - plik dłuższy niż
+    wynika z nagłówka to blok przerwany w połowie.
+    """
+    HEADER = struct.Struct("<4sQQ")
+    # początek klucza adresu, wysokość, pozycja, delta, poprzedni wpis + 1 (0 = brak)
+    ENTRY = struct.Struct("<8sQIdQ")
+    MAGIC = b"BSAH"
+
+    def __init__(self, path, heads_path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.heads = HashIndex(heads_path, readonly)
+        self._fd = None
+        self.blocks = self.count = 0
+        if not readonly:
+            if not os.path.exists(path):
+                self._create()
+            self._fd = os.open(path, os.O_RDWR)
+            _, self.blocks, self.count = self.HEADER.unpack(
+                os.pread(self._fd, self.HEADER.size, 0))
+
+    def _create(self):
+        with open(self.path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, 0, 0))
+
+    @staticmethod
+    def key(address):
+        return hashlib.sha256(address.encode()).digest()
+
+    @property
+    def consistent(self):
+        size = os.fstat(self._fd).st_size
+        return (not self.heads.reset and
+                size == self.HEADER.size + self.count * self.ENTRY.size)
+
+    def add_block(self, height, transactions):
+        """Dopisuje wpisy bloku na wysokości height (kolejny po self.blocks)"""
+        entries, heads = [], {}
+        for position, tx in enumerate(transactions):
+            # Zmiana salda na adres w tej transakcji (przelew do siebie = 0)
+            changes = {}
+            if tx.recipient is not None:
+                changes[tx.recipient] = tx.amount
+            if not tx.is_coinbase and tx.sender is not None:
+                changes[tx.sender] = changes.get(tx.sender, 0) - tx.cost
+            for address, delta in changes.items():
+                key = self.key(address)
+                prev = heads.get(key)
+                if prev is None:
+                    head = self.heads.get(key)
+                    prev = 0 if head is None else head + 1
+                entries.append(self.ENTRY.pack(key[:8], height, position, delta, prev))
+                heads[key] = self.count + len(entries)
+        if entries:
+            os.pwrite(self._fd, b"".join(entries),
+                      self.HEADER.size + self.count * self.ENTRY.size)
+            for key, number in heads.items():
+                self.heads.put(key, number - 1)
+        self.count += len(entries)
+        self.blocks = height + 1
+        os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, self.blocks, self.count), 0)
+
+    def page(self, address, cursor=None, limit=50):
+        """Strona historii adresu od najnowszych: ([(wysokość, pozycja, delta)], kursor).
+
+        cursor to wartość zwrócona z poprzedniej strony; None na końcu historii.
+        """
+        key = self.key(address)
+        if cursor is None:
+            head = self.heads.get(key)
+            cursor = 0 if head is None else head + 1
+        if cursor < 0:
+            raise ValueError("Invalid history cursor")
+        if not cursor:
+            return [], None
+        fd = self._fd if self._fd is not None else os.open(self.path, os.O_RDONLY)
+        try:
+            entries = []
+            while cursor and len(entries) < limit:
+                raw = os.pread(fd, self.ENTRY.size,
+                               self.HEADER.size + (cursor - 1) * self.ENTRY.size)
+                if len(raw) < self.ENTRY.size:
+                    raise ValueError(f"Invalid history cursor {cursor}")
+                prefix, height, position, delta, cursor = self.ENTRY.unpack(raw)
+                if prefix != key[:8]:
+                    raise ValueError(f"History cursor does not belong to {address}")
+                entries.append((height, position, delta))
+            return entries, cursor or None
+        finally:
+            if fd is not self._fd:
+                os.close(fd)
+
+    def clear(self):
+        """Pusta historia (przed przebudową)"""
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, 0, 0), 0)
+        self.blocks = self.count = 0
+        self.heads.clear()
+
+    def close(self):
+        self.heads.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+# Test indeksu hashy z zerami na początku (jak hashe bloków po PoW)
+if __name__ == "__main__":
+    import tempfile, time
+    
+    print("=== BitsCoin Hash Index Test ===")
+    path = os.path.join(tempfile.mkdtemp(), "hashes.idx")
+    index = HashIndex(path)
+    keys = [bytes(4) + hashlib.sha256(str(i).encode()).digest()[4:] for i in range(4000)]
+    start = time.time()
+    for height, key in enumerate(keys):
+        index.put(key, height)
+    print(f"Build: {time.time() - start:.3f}s")
+    
+    start = time.time()
+    assert all(index.get(key) == height for height, key in enumerate(keys))
+    assert index.get(bytes(32)) is None
+    assert HashIndex(path, readonly=True).get(keys[-1]) == len(keys) - 1
+    print(f"Lookup: {(time.time() - start) / len(keys) * 1000:.4f}ms")
+    
+    # Stary format (inny magic) jest zakładany od nowa
+    index.close()
+    with open(path, "r+b") as f:
+        f.write(b"BSHI")
+    index = HashIndex(path)
+    assert index.reset and index.count == 0 and index.get(keys[0]) is None
+    print("Hash index OK")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Format Nagłówka Bloku
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import hashlib, json, math, struct
+
+# Wersja 1: hash z json.dumps(sort_keys=True) - stare bloki z chain.json
+LEGACY_VERSION = 1
+# Wersja 2: binarny nagłówek, nonce doklejany na końcu (midstate)
+MIDSTATE_VERSION = 2
+# Wersja 3: jak 2 + pole bits (kompaktowy 256-bitowy target)
+BITS_VERSION = 3
+# Wersja 4: jak 3, treść bloku to data + lista transakcji
+TX_VERSION = 4
+# Wersja 5: jak 4 + korzeń Merkle txidów w nagłówku (pierwsze 32 bajty treści)
+MERKLE_VERSION = 5
+HEADER_VERSION = MERKLE_VERSION
+
+# version, index, previous_hash, timestamp, sha256(data)
+PREFIX_V2 = struct.Struct("<IQ32sd32s")
+# version, index, previous_hash, timestamp, bits, sha256(treść bloku)
+PREFIX = struct.Struct("<IQ32sdI32s")
+# version, index, previous_hash, timestamp, bits, korzeń Merkle, sha256(data)
+PREFIX_V5 = struct.Struct("<IQ32sdI32s32s")
+NONCE = struct.Struct("<Q")
+# Kanoniczny rekord bloku: version, index, previous_hash, timestamp, bits,
+# nonce, hash - po nim treść bloku do końca rekordu (do wersji 3 data w UTF-8)
+BLOCK_RECORD = struct.Struct("<IQ32sdIQ32s")
+# Od wersji 4 data i każda transakcja w treści mają prefiks długości
+LENGTH = struct.Struct("<I")
+
+ZERO_HASH = bytes(32)
+MAX_TARGET = (1 << 256) - 1
+
+def hash_to_bytes(hex_hash):
+    """Hash w hex -> 32 bajty ("0" z genesis to same zera)"""
+    return bytes.fromhex(hex_hash.rjust(64, "0"))
+
+def bytes_to_hash(raw):
+    """32 bajty -> hash w hex (same zera to "0" jak w genesis)"""
+    return "0" if raw == ZERO_HASH else raw.hex()
+
+def body_parts(body, pos=0):
+    """Kolejne fragmenty z prefiksem długości (data, potem transakcje)"""
+    view = memoryview(body)
+    while pos < len(view):
+        length, = LENGTH.unpack_from(view, pos)
+        pos += LENGTH.size
+        yield view[pos:pos + length]
+        pos += length
+
+def encode_prefix(version, index, previous_hash, timestamp, data, bits=0):
+    """Kanoniczny nagłówek bez nonce'a (previous_hash i treść bloku jako bajty).
+
+    Od wersji 5 nagłówek wiąże transakcje tylko przez korzeń Merkle, więc
+    przynależność transakcji sprawdza się dowodem, bez całej treści.
+    """
+    if version >= MERKLE_VERSION:
+        text = next(body_parts(data, 32))
+        return PREFIX_V5.pack(version, index, previous_hash, timestamp, bits,
+                              bytes(data[:32]),
+                              hashlib.sha256(text).digest())
+    data_hash = hashlib.sha256(data).digest()
+    if version == MIDSTATE_VERSION:
+        return PREFIX_V2.pack(version, index, previous_hash, timestamp, data_hash)
+    return PREFIX.pack(version, index, previous_hash, timestamp, bits, data_hash)
+
+def midstate(prefix):
+    """Stan SHA-256 po prefiksie - do kopiowania dla każdego nonce'a"""
+    return hashlib.sha256(prefix)
+
+def hash_nonce(state, nonce):
+    """Dokańcza hash z midstate dla danego nonce'a"""
+    h = state.copy()
+    h.update(NONCE.pack(nonce))
+    return h.digest()
+
+def difficulty_to_target(difficulty):
+    """Difficulty d = hash poniżej 2^(256-4d), czyli ~d zer hex; d może być ułamkiem"""
+    if difficulty <= 0:
+        return MAX_TARGET
+    return min(MAX_TARGET, int(2 ** (256 - 4 * difficulty)) - 1)
+
+# Najniższa difficulty sieci - blok z bits powyżej tego targetu jest odrzucany
+MIN_DIFFICULTY = 1
+MAX_POW_TARGET = difficulty_to_target(MIN_DIFFICULTY)
+
+def target_to_difficulty(target):
+    return (256 - math.log2(target + 1)) / 4
+
+def target_to_bits(target):
+    """256-bitowy target -> kompaktowe bits (wykładnik + 3 bajty mantysy)"""
+    size = (target.bit_length() + 7) // 8
+    if size <= 3:
+        mantissa = target << (8 * (3 - size))
+    else:
+        mantissa = target >> (8 * (size - 3))
+    # Najstarszy bit mantysy to bit znaku w formacie compact
+    if mantissa & 0x00800000:
+        mantissa >>= 8
+        size += 1
+    return (size << 24) | mantissa
+
+def bits_to_target(bits):
+    """Kompaktowe bits -> 256-bitowy target"""
+    size = bits >> 24
+    mantissa = bits & 0x007fffff
+    if size <= 3:
+        return mantissa >> (8 * (3 - size))
+    return min(MAX_TARGET, mantissa << (8 * (size - 3)))
+
+def target_bytes(target):
+    """Target jako 32 bajty big-endian - porównywalny wprost z digest()"""
+    return target.to_bytes(32, "big")
+
+def meets_target(digest, target):
+    return int.from_bytes(digest, "big") <= target
+
+def legacy_hash(index, previous_hash, timestamp, data, nonce):
+    """Hash bloku w starym formacie JSON"""
+    s = json.dumps({
+        "index": index,
+        "previous_hash": previous_hash,
+        "timestamp": timestamp,
+        "data": data,
+        "nonce": nonce
+    }, sort_keys=True).encode()
+    return hashlib.sha256(s).hexdigest()
+
+def block_digest(version, index, prev_hash, timestamp, data, bits, nonce):
+    """Hash nagłówka w formacie danej wersji, jako 32 bajty"""
+    if version == LEGACY_VERSION:
+        return bytes.fromhex(legacy_hash(
+            index, bytes_to_hash(prev_hash), timestamp, str(data, "utf-8"), nonce))
+    prefix = encode_prefix(version, index, prev_hash, timestamp, data, bits)
+    return hash_nonce(midstate(prefix), nonce)
+
+def record_digest(raw):
+    """Przelicza hash z kanonicznego rekordu bloku (bytes/memoryview)"""
+    version, index, prev, timestamp, bits, nonce, _ = BLOCK_RECORD.unpack_from(raw)
+    return block_digest(version, index, prev, timestamp,
+                        raw[BLOCK_RECORD.size:], bits, nonce)
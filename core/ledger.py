@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Księga Sald
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+class Ledger:
+    """Salda adresów aktualizowane przy każdym dołączonym bloku.
+
+    Odczyt salda to jedno wyszukanie w słowniku. Każda transakcja bloku
+    (z coinbase) uznaje odbiorcę i obciąża nadawcę kwotą z opłatą.
+    addresses ogranicza księgę do wybranych adresów (None - wszystkie).
+    """
+    def __init__(self, addresses=None):
+        self.addresses = None if addresses is None else set(addresses)
+        self.balances = {}
+        self.height = -1
+
+    def apply_block(self, blk):
+        """Księguje blok na szczycie łańcucha"""
+        self.height = blk.index
+        for tx in blk.transactions:
+            self.credit(tx.recipient, tx.amount)
+            if not tx.is_coinbase:
+                self.credit(tx.sender, -tx.cost)
+
+    def credit(self, address, amount):
+        if address is None or (self.addresses is not None and address not in self.addresses):
+            return
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    def balance(self, address):
+        return self.balances.get(address, 0)
+
+def compute_balances(blocks, addresses=None):
+    """Salda wielu adresów jednym przejściem po blokach.
+
+    Wspólny pełny skan dla node'a (weryfikacja księgi) i CLI. Zwraca
+    słownik adres -> saldo; adresy bez transakcji mają saldo 0.
+    """
+    ledger = Ledger(addresses)
+    for blk in blocks:
+        ledger.apply_block(blk)
+    if addresses is None:
+        return ledger.balances
+    return {address: ledger.balance(address) for address in addresses}
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Mempool
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import heapq, time
+from utxo import outpoint
+
+# Limit rozmiaru (suma kanonicznych kodowań) i czas życia transakcji
+MAX_BYTES = 4 * 1024 * 1024
+EXPIRY = 3 * 3600
+
+class Mempool:
+    """Oczekujące transakcje uporządkowane po opłacie za bajt.
+
+    Dwa kopce (najlepsza i najgorsza opłata) dają wstawienie i wyrzucenie
+    w O(log n); usunięte wpisy są pomijane leniwie i sprzątane, gdy
+    przeważą nad żywymi. Trzeci kopiec (od najstarszego now z add) pilnuje
+    wygasania - now nie musi rosnąć z kolejnymi add. spends mapuje
+    wydawane wyjścia na txid - to rezerwacje monet i wykrywanie konfliktów.
+    listener (np. TemplateBuilder) dostaje added(tx)/removed(tx) przy
+    każdej zmianie, żeby nadążać bez przeglądania całego mempoolu.
+    """
+    def __init__(self, max_bytes=MAX_BYTES, expiry=EXPIRY, listener=None):
+        self.max_bytes = max_bytes
+        self.expiry = expiry
+        self.listener = listener
+        self.entries = {}
+        self.added = {}
+        self.spends = {}
+        self.bytes = 0
+        self._best = []
+        self._worst = []
+        self._arrivals = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, txid):
+        return txid in self.entries
+
+    def add(self, tx, now=None):
+        """Dodaje transakcję; zwraca listę wyrzuconych, żeby zrobić miejsce.
+
+        now to chwila, od której liczy się expiry (domyślnie bieżący czas).
+        ValueError gdy transakcja już jest, wydaje zarezerwowane wyjście
+        albo pełny mempool ma tylko transakcje z lepszą opłatą.
+        """
+        now = time.time() if now is None else now
+        if tx.txid in self.entries:
+            raise ValueError(f"Transaction {tx.txid} already in mempool")
+        keys = [outpoint(*i) for i in tx.inputs]
+        for key in keys:
+            if key in self.spends:
+                raise ValueError(f"Input already spent by {self.spends[key]}")
+        rate = tx.fee_rate
+        evicted = []
+        while self.bytes + tx.size > self.max_bytes:
+            worst = self._peek(self._worst)
+            if worst is None or worst.fee_rate >= rate:
+                for old, added in evicted:
+                    self._insert(old, added)
+                raise ValueError("Mempool full - fee rate too low")
+            evicted.append((worst, self.added[worst.txid]))
+            self.remove(worst.txid)
+        self._insert(tx, now)
+        return [old for old, _ in evicted]
+
+    def _insert(self, tx, now):
+        self._seq += 1
+        self.entries[tx.txid] = tx
+        self.added[tx.txid] = now
+        for i in tx.inputs:
+            self.spends[outpoint(*i)] = tx.txid
+        self.bytes += tx.size
+        heapq.heappush(self._best, (-tx.fee_rate, self._seq, tx.txid))
+        heapq.heappush(self._worst, (tx.fee_rate, -self._seq, tx.txid))
+        heapq.heappush(self._arrivals, (now, self._seq, tx.txid))
+        if self.listener is not None:
+            self.listener.added(tx)
+
+    def _peek(self, heap):
+        """Szczyt kopca z pominięciem usuniętych wpisów"""
+        while heap and heap[0][2] not in self.entries:
+            heapq.heappop(heap)
+        return self.entries[heap[0][2]] if heap else None
+
+    def remove(self, txid):
+        """Usuwa transakcję (None gdy jej nie ma) - wpisy w kopcach znikną leniwie"""
+        tx = self.entries.pop(txid, None)
+        if tx is None:
+            return None
+        del self.added[txid]
+        for i in tx.inputs:
+            self.spends.pop(outpoint(*i), None)
+        self.bytes -= tx.size
+        # Sprzątanie kopców, gdy martwe wpisy przeważają
+        if len(self._best) > 2 * len(self.entries) + 64:
+            self._best = [e for e in self._best if e[2] in self.entries]
+            self._worst = [e for e in self._worst if e[2] in self.entries]
+            heapq.heapify(self._best)
+            heapq.heapify(self._worst)
+            self._arrivals = [a for a in self._arrivals if a[2] in self.entries]
+            heapq.heapify(self._arrivals)
+        if self.listener is not None:
+            self.listener.removed(tx)
+        return tx
+
+    def remove_block(self, blk):
+        """Zdejmuje transakcje z bloku i te, których wejścia blok wydał"""
+        removed = []
+        for tx in blk.transactions:
+            if self.remove(tx.txid) is not None:
+                removed.append(tx)
+            for i in tx.inputs:
+                txid = self.spends.get(outpoint(*i))
+                if txid is not None:
+                    removed.append(self.remove(txid))
+        return removed
+
+    def expire(self, now=None):
+        """Usuwa transakcje starsze niż expiry, zwraca je"""
+        now = time.time() if now is None else now
+        expired = []
+        while self._arrivals and self._arrivals[0][0] + self.expiry <= now:
+            _, _, txid = heapq.heappop(self._arrivals)
+            tx = self.remove(txid)
+            if tx is not None:
+                expired.append(tx)
+        return expired
+
+    def select(self, max_bytes=None):
+        """Transakcje od najwyższej opłaty za bajt, w limicie bajtów.
+
+        Kopia kopca i zdejmowanie kolejnych - O(n + k log n) dla k
+        wybranych. Transakcja za duża na resztę limitu jest pomijana.
+        """
+        heap = list(self._best)
+        selected, used = [], 0
+        while heap:
+            _, _, txid = heapq.heappop(heap)
+            tx = self.entries.get(txid)
+            if tx is None:
+                continue
+            if max_bytes is not None and used + tx.size > max_bytes:
+                continue
+            selected.append(tx)
+            used += tx.size
+        return selected
+
+    def transactions(self):
+        return list(self.entries.values())
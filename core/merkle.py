@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Drzewo Merkle
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import hashlib
+from header import ZERO_HASH
+
+def merkle_parent(left, right):
+    """Węzeł rodzica - podwójny sha256 z połączonych dzieci"""
+    return hashlib.sha256(hashlib.sha256(left + right).digest()).digest()
+
+class MerkleTree:
+    """Drzewo Merkle nad txidami (32 bajty) z zapamiętanymi poziomami.
+
+    Nieparzysty ostatni węzeł poziomu jest łączony sam ze sobą, jak
+    w Bitcoinie. Dowód to hashe rodzeństwa od liści do korzenia - log2(n)
+    wpisów, wycinanych z zapamiętanych poziomów bez przeliczania.
+    """
+    def __init__(self, leaves):
+        level = [bytes(leaf) for leaf in leaves]
+        self.levels = [level]
+        while len(level) > 1:
+            if len(level) % 2:
+                level = level + [level[-1]]
+            level = [merkle_parent(level[i], level[i + 1])
+                     for i in range(0, len(level), 2)]
+            self.levels.append(level)
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    @property
+    def root(self):
+        """Korzeń (same zera dla pustego drzewa)"""
+        return self.levels[-1][0] if self.levels[0] else ZERO_HASH
+
+    def proof(self, index):
+        """Hashe rodzeństwa liścia index, od dołu do korzenia"""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Leaf {index} out of range")
+        siblings = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            siblings.append(level[sibling] if sibling < len(level) else level[index])
+            index //= 2
+        return siblings
+
+def merkle_root(leaves):
+    return MerkleTree(leaves).root
+
+def verify_proof(leaf, index, siblings, root):
+    """Czy liść na pozycji index należy do drzewa o danym korzeniu - O(log n)"""
+    node = bytes(leaf)
+    for sibling in siblings:
+        node = merkle_parent(sibling, node) if index & 1 else merkle_parent(node, sibling)
+        index //= 2
+    return index == 0 and node == bytes(root)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Silnik Miningu
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import math, os, time, threading
+import multiprocessing as mp
+from collections import deque
+from header import NONCE, target_bytes
+
+# Przeszukiwana przestrzeń nonce'ów - 2^53, żeby explorer w JS czytał nonce dokładnie
+NONCE_SPACE = 1 << 53
+
+_stop_event = None
+_tuner = None
+
+def _init_worker(stop_event):
+    """Inicjalizacja procesu workera - wspólna flaga stop i własny tuner"""
+    global _stop_event, _tuner
+    _stop_event = stop_event
+    _tuner = BatchTuner()
+
+class BatchTuner:
+    """Dobiera rozmiar paczki nonce'ów tak, by paczka trwała ~batch_seconds"""
+    def __init__(self, batch_seconds=0.02, size=4096, min_size=256, max_size=1 << 20):
+        self.batch_seconds = batch_seconds
+        self.size = size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.rate = 0.0
+
+    def update(self, hashes, elapsed):
+        """Aktualizuje zmierzone H/s i rozmiar następnej paczki"""
+        if hashes <= 0 or elapsed <= 0:
+            return self.size
+        rate = hashes / elapsed
+        # Wygładzanie, żeby pojedyncza przerwa schedulera nie rozwaliła rozmiaru
+        self.rate = rate if not self.rate else 0.7 * self.rate + 0.3 * rate
+        size = int(self.rate * self.batch_seconds)
+        self.size = max(self.min_size, min(self.max_size, size))
+        return self.size
+
+def search_nonces(state, start, count, target):
+    """Sprawdza count nonce'ów od start w jednym wywołaniu.
+
+    target to 32 bajty big-endian - digest porównywany bez konwersji na hex.
+    Zwraca (nonce, liczba_hashy); nonce to None gdy paczka nic nie dała.
+    """
+    copy = state.copy
+    hashes = 0
+    for nonce_bytes in map(NONCE.pack, range(start, start + count)):
+        h = copy()
+        h.update(nonce_bytes)
+        hashes += 1
+        if h.digest() <= target:
+            return NONCE.unpack(nonce_bytes)[0], hashes
+    return None, hashes
+
+def _scan(block, worker_id, start, end, target, stop, tuner):
+    """Przeszukuje zakres [start, end) paczkami dobieranymi przez tuner.
+
+    Flaga stop (anulowanie albo sukces innego workera) jest sprawdzana
+    między paczkami, więc reakcja trwa najwyżej jedną paczkę.
+    """
+    target = target_bytes(target)
+    state = block.midstate()
+    hashes = 0
+    nonce = start
+    while nonce < end and not stop.is_set():
+        count = min(tuner.size, end - nonce)
+        t = time.perf_counter()
+        found, n = search_nonces(state, nonce, count, target)
+        tuner.update(n, time.perf_counter() - t)
+        hashes += n
+        if found is not None:
+            return worker_id, found, hashes
+        nonce += count
+    return worker_id, None, hashes
+
+def _pool_scan(args):
+    result = _scan(*args, stop=_stop_event, tuner=_tuner)
+    if result[1] is not None:
+        # Znaleziony nonce - zatrzymaj pozostałych workerów
+        _stop_event.set()
+    return result
+
+def partition(workers, space=NONCE_SPACE):
+    """Dzieli przestrzeń nonce'ów na ciągłe zakresy, po jednym na workera"""
+    span = space // workers
+    return [(w * span, space if w == workers - 1 else (w + 1) * span)
+            for w in range(workers)]
+
+class MiningJob:
+    """Zadanie miningu z tokenem anulowania sprawdzanym co paczkę nonce'ów"""
+    def __init__(self, block, target):
+        self.block = block
+        self.target = target
+        self._cancelled = threading.Event()
+        # Flaga stop puli procesów - podpinana przez silnik na czas zadania
+        self._stop = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Przerywa zadanie - workerzy kończą po bieżącej paczce"""
+        with self._lock:
+            self._cancelled.set()
+            if self._stop is not None:
+                self._stop.set()
+
+    def _attach(self, stop):
+        with self._lock:
+            self._stop = stop
+            if self._cancelled.is_set() and stop is not None:
+                stop.set()
+
+class MiningResult:
+    """Wynik wyszukiwania nonce'a: wykopany blok i liczba hashy per worker"""
+    def __init__(self, block, hashes, elapsed, cancelled=False):
+        self.block = block
+        self.hashes = hashes
+        self.elapsed = elapsed
+        # Zadanie przerwane - block to None
+        self.cancelled = cancelled
+
+    @property
+    def total_hashes(self):
+        return sum(self.hashes)
+
+def percentile(values, p):
+    """Percentyl metodą najbliższej rangi (values posortowane)"""
+    if not values:
+        return None
+    k = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return values[k]
+
+class MiningStats:
+    """Telemetria miningu zbierana przez silnik po każdym zadaniu"""
+    def __init__(self, workers, history=1000):
+        self.worker_hashes = [0] * workers
+        self.busy_time = 0.0
+        self.blocks = 0
+        self.cancelled = 0
+        self.useful_hashes = 0
+        self.stale_hashes = 0
+        # Ostatnie czasy do bloku i nonce'y na blok - do percentyli
+        self.block_times = deque(maxlen=history)
+        self.block_nonces = deque(maxlen=history)
+        self.last_rates = [0.0] * workers
+        self._lock = threading.Lock()
+
+    def record(self, result):
+        """Rejestruje wynik zadania (znaleziony blok albo przerwana praca)"""
+        with self._lock:
+            total = result.total_hashes
+            for w, n in enumerate(result.hashes):
+                self.worker_hashes[w] += n
+                self.last_rates[w] = n / result.elapsed if result.elapsed > 0 else 0.0
+            self.busy_time += result.elapsed
+            if result.cancelled:
+                self.cancelled += 1
+                self.stale_hashes += total
+            else:
+                self.blocks += 1
+                self.useful_hashes += total
+                self.block_times.append(result.elapsed)
+                self.block_nonces.append(total)
+
+    def discard(self, result):
+        """Znaleziony blok nie wszedł do łańcucha (tip się zmienił) - praca stale"""
+        with self._lock:
+            total = result.total_hashes
+            self.blocks -= 1
+            self.useful_hashes -= total
+            self.stale_hashes += total
+            if self.block_times and self.block_times[-1] == result.elapsed:
+                self.block_times.pop()
+                self.block_nonces.pop()
+
+    def snapshot(self):
+        """Słownik z metrykami - H/s per worker i łącznie, percentyle, stale ratio"""
+        with self._lock:
+            busy = self.busy_time
+            total = self.useful_hashes + self.stale_hashes
+            times = sorted(self.block_times)
+            nonces = list(self.block_nonces)
+            return {
+                "workers": len(self.worker_hashes),
+                "hashrate": total / busy if busy > 0 else 0.0,
+                "worker_hashrate": [n / busy if busy > 0 else 0.0
+                                    for n in self.worker_hashes],
+                "last_worker_hashrate": list(self.last_rates),
+                "total_hashes": total,
+                "blocks": self.blocks,
+                "cancelled_jobs": self.cancelled,
+                "avg_nonces_per_block": sum(nonces) / len(nonces) if nonces else 0,
+                "last_nonces_per_block": nonces[-1] if nonces else 0,
+                "time_to_block": {
+                    "p50": percentile(times, 50),
+                    "p90": percentile(times, 90),
+                    "p99": percentile(times, 99),
+                },
+                "stale_ratio": self.stale_hashes / total if total else 0.0,
+            }
+
+class MiningEngine:
+    """Równoległy proof-of-work - przestrzeń nonce'ów dzielona na pulę procesów"""
+    def __init__(self, workers=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._pool = None
+        self._stop = None
+        self._lock = threading.Lock()
+        self._tuner = BatchTuner()
+        self.stats = MiningStats(self.workers)
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._stop = mp.Event()
+            self._pool = mp.Pool(self.workers, initializer=_init_worker,
+                                 initargs=(self._stop,))
+        return self._pool
+
+    def mine(self, block, target):
+        """Szuka nonce'a z hashem <= target (int 256-bit), zwraca MiningResult"""
+        return self.run(MiningJob(block, target))
+
+    def run(self, job):
+        """Wykonuje zadanie miningu; przerwane zadanie daje result.cancelled"""
+        block = job.block
+        with self._lock:
+            start = time.time()
+            ranges = partition(self.workers)
+            if self.workers == 1:
+                lo, hi = ranges[0]
+                results = [_scan(block, 0, lo, hi, job.target,
+                                 job._cancelled, self._tuner)]
+            else:
+                pool = self._ensure_pool()
+                self._stop.clear()
+                job._attach(self._stop)
+                tasks = [(block, w, lo, hi, job.target)
+                         for w, (lo, hi) in enumerate(ranges)]
+                try:
+                    results = pool.map(_pool_scan, tasks)
+                finally:
+                    job._attach(None)
+
+            hashes = [0] * self.workers
+            found = []
+            for worker_id, nonce, count in results:
+                hashes[worker_id] = count
+                if nonce is not None:
+                    found.append(nonce)
+
+            elapsed = time.time() - start
+            if not found:
+                result = MiningResult(None, hashes, elapsed, cancelled=True)
+            else:
+                result = MiningResult(block.with_nonce(min(found)), hashes, elapsed)
+            self.stats.record(result)
+            return result
+
+    def close(self):
+        """Zamyka pulę procesów"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
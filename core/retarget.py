@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Retargeting Difficulty
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+from collections import deque
+from header import MAX_POW_TARGET
+
+class DifficultyRetargeter:
+    """Retarget na przesuwnym oknie ostatnich bloków.
+
+    Nowy target = średni target z okna * (rzeczywisty czas okna / oczekiwany).
+    Suma targetów i skrajne timestampy są trzymane na bieżąco, więc każdy
+    blok kosztuje O(1) niezależnie od długości łańcucha. Target nie rośnie
+    ponad MAX_POW_TARGET (MIN_DIFFICULTY), którego pilnuje walidacja.
+    """
+    def __init__(self, block_time=10.0, window=30, max_adjust=4.0):
+        self.block_time = block_time
+        self.max_adjust = max_adjust
+        # window+1 timestampów wyznacza window odstępów między blokami
+        self.timestamps = deque(maxlen=window + 1)
+        self.targets = deque(maxlen=window)
+        self.target_sum = 0
+
+    def observe(self, timestamp, target=None):
+        """Dodaje blok do okna (genesis bez targetu wnosi tylko timestamp)"""
+        self.timestamps.append(timestamp)
+        if target is None:
+            return
+        if len(self.targets) == self.targets.maxlen:
+            self.target_sum -= self.targets[0]
+        self.targets.append(target)
+        self.target_sum += target
+
+    def next_target(self, current):
+        """Target dla następnego bloku; current gdy okno jest jeszcze puste"""
+        intervals = len(self.timestamps) - 1
+        if intervals < 1 or not self.targets:
+            return current
+        expected = intervals * self.block_time
+        actual = self.timestamps[-1] - self.timestamps[0]
+        # Ograniczenie skoku, żeby jeden szybki/wolny blok nie wywrócił sieci
+        actual = max(expected / self.max_adjust, min(expected * self.max_adjust, actual))
+        average = self.target_sum // len(self.targets)
+        # Mnożenie na intach (milisekundy) - float zgubiłby precyzję 256 bitów
+        target = average * int(actual * 1000) // max(1, int(expected * 1000))
+        return max(1, min(MAX_POW_TARGET, target))
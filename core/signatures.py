@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Weryfikacja Podpisów
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import hashlib, os, threading
+import multiprocessing as mp
+from collections import OrderedDict
+import base58
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from wallet import address_from_der, key_type_of, verify_message
+
+# Poniżej tylu podpisów narzut puli przeważa - weryfikacja w procesie głównym
+MIN_PARALLEL = 64
+# Podpisów na zadanie dla procesu
+CHUNK_SIZE = 32
+# Sparsowanych kluczy publicznych trzymanych w każdym procesie
+KEY_CACHE = 1024
+# Zapamiętanych poprawnych weryfikacji (mempool + kilka bloków z zapasem)
+CACHE_SIZE = 100000
+
+_keys = {}
+
+def _public_key(der):
+    """Klucz z DER parsowany raz na proces (obiekty kluczy nie przechodzą przez pickle)"""
+    key = _keys.get(der)
+    if key is None:
+        if len(_keys) >= KEY_CACHE:
+            _keys.clear()
+        key = _keys[der] = serialization.load_der_public_key(der)
+    return key
+
+def _verify_chunk(items):
+    """Worker: [(DER klucza, wiadomość, podpis)] -> [bool]"""
+    results = []
+    for der, message, signature in items:
+        try:
+            verify_message(_public_key(der), signature, message)
+            results.append(True)
+        except (InvalidSignature, ValueError, TypeError):
+            results.append(False)
+    return results
+
+def _prepare(tx):
+    """Zdekodowany podpis transakcji albo None, gdy nie może być poprawny"""
+    if not tx.signature or not tx.public_key:
+        return None
+    try:
+        der = base58.b58decode(tx.public_key)
+        signature = base58.b58decode(tx.signature)
+        # Klucz musi należeć do nadawcy - adres to hash klucza z wersją typu
+        if address_from_der(der, key_type_of(tx.sender)) != tx.sender:
+            return None
+    except ValueError:
+        return None
+    return der, tx.message().encode(), signature
+
+class VerificationCache:
+    """LRU poprawnie zweryfikowanych podpisów, klucz (txid, sha256(podpis)).
+
+    Trzyma tylko sukcesy - błędny podpis zawsze jest sprawdzany od nowa.
+    hits/misses pozwalają dobrać maxsize.
+    """
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tx):
+        return tx.txid, hashlib.sha256(tx.signature.encode()).digest()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, tx):
+        key = self.key(tx)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, tx):
+        key = self.key(tx)
+        self.entries[key] = None
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+class SignatureVerifier:
+    """Wsadowa weryfikacja podpisów transakcji na puli procesów.
+
+    Proces główny dekoduje podpisy i sprawdza, czy klucz daje adres
+    nadawcy; procesy puli weryfikują paczki po CHUNK_SIZE, parsując każdy
+    klucz publiczny raz. Małe wsady idą bez puli. Podpisy z cache (np.
+    sprawdzone w mempoolu) nie są weryfikowane ponownie przy bloku.
+    """
+    def __init__(self, workers=None, cache_size=CACHE_SIZE):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache = VerificationCache(cache_size)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._pool = mp.Pool(self.workers)
+        return self._pool
+
+    def verify(self, transactions):
+        """Wynik dla każdej transakcji (coinbase nie ma podpisu - zawsze True)"""
+        transactions = list(transactions)
+        results = []
+        items, slots = [], []
+        with self._lock:
+            for tx in transactions:
+                if tx.is_coinbase or (tx.signature and tx in self.cache):
+                    results.append(True)
+                    continue
+                item = _prepare(tx)
+                results.append(False)
+                if item is not None:
+                    items.append(item)
+                    slots.append(len(results) - 1)
+            if len(items) < MIN_PARALLEL or self.workers == 1:
+                verified = _verify_chunk(items)
+            else:
+                chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+                verified = [ok for chunk in self._ensure_pool().map(_verify_chunk, chunks)
+                            for ok in chunk]
+            for slot, ok in zip(slots, verified):
+                results[slot] = ok
+                if ok:
+                    self.cache.add(transactions[slot])
+        return results
+
+    def remember(self, tx):
+        """Zapisuje w cache transakcję z już sprawdzonym podpisem.
+
+        Węzeł dobiera wejścia po weryfikacji - nowy txid, ale ten sam
+        podpisany komunikat, klucz i podpis.
+        """
+        with self._lock:
+            self.cache.add(tx)
+
+    def verify_block(self, blk):
+        return self.verify(blk.transactions)
+
+    def close(self):
+        """Zamyka pulę procesów"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Magazyn Bloków
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import os, json, mmap, struct, threading, zlib
+import header
+from blockindex import HeightIndex, HashIndex, HistoryIndex
+
+# Nagłówek rekordu w segmencie: długość, crc32 zawartości
+RECORD_HEADER = struct.Struct("<II")
+SEGMENT_SIZE = 64 * 1024 * 1024
+SEGMENT_NAME = "blk{:05d}.dat"
+# Indeksy obok segmentów: wysokość -> (segment, offset) i hash -> wysokość
+HEIGHT_INDEX_NAME = "heights.idx"
+HASH_INDEX_NAME = "hashes.idx"
+# Historia adresów: wpisy (wysokość, pozycja, delta) i głowy list per adres
+HISTORY_NAME = "history.dat"
+HISTORY_INDEX_NAME = "history.idx"
+# Dziennik transakcji z CLI czekających na node (JSON, linia po linii)
+JOURNAL_NAME = "mempool.log"
+JOURNAL_OFFSET_NAME = "mempool.offset"
+# Znacznik walidacji: "wysokość hash" ostatniego sprawdzonego bloku
+VALIDATED_NAME = "validated"
+# Domyślny katalog magazynu node'a: core/blocks
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blocks")
+
+def segment_path(directory, number):
+    return os.path.join(directory, SEGMENT_NAME.format(number))
+
+def read_records(f, offset=0):
+    """Iteruje (offset, rekord) po segmencie; kończy na uciętym/uszkodzonym rekordzie"""
+    f.seek(offset)
+    while True:
+        head = f.read(RECORD_HEADER.size)
+        if len(head) < RECORD_HEADER.size:
+            return
+        length, crc = RECORD_HEADER.unpack(head)
+        raw = f.read(length)
+        if len(raw) < length or zlib.crc32(raw) != crc:
+            return
+        yield offset, raw
+        offset += RECORD_HEADER.size + length
+
+class BlockStore:
+    """Append-only log bloków: każdy blok to rekord z prefiksem długości.
+
+    Nowe bloki są dopisywane na końcu bieżącego segmentu, więc zapis
+    kosztuje O(rozmiar bloku). Po awarii przy otwarciu obcinany jest
+    co najwyżej ostatni, niedopisany rekord. Indeksy wysokości i hashy
+    pozwalają czytać pojedyncze bloki w O(1) bez ładowania łańcucha,
+    a indeks historii - strony historii adresu.
+    """
+    def __init__(self, directory, segment_size=SEGMENT_SIZE, fsync=False,
+                 readonly=False):
+        self.directory = os.path.abspath(directory)
+        self.segment_size = segment_size
+        self.fsync = fsync
+        # Czytelnik (CLI, API) nigdy nie obcina segmentów zapisywanych przez node
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.segments = 0
+        while os.path.exists(segment_path(self.directory, self.segments)):
+            self.segments += 1
+        self._file = None
+        self._readers = {}
+        self.heights = HeightIndex(os.path.join(self.directory, HEIGHT_INDEX_NAME), readonly)
+        self.hashes = HashIndex(os.path.join(self.directory, HASH_INDEX_NAME), readonly)
+        self.history = HistoryIndex(os.path.join(self.directory, HISTORY_NAME),
+                                    os.path.join(self.directory, HISTORY_INDEX_NAME), readonly)
+        if not readonly:
+            self._recover()
+            self._sync_history()
+
+    def _recover(self):
+        """Doindeksowuje rekordy za ostatnim wpisem indeksu i obcina urwany ogon.
+
+        Skanowany jest tylko ogon dopisany po ostatnim wpisie indeksu, więc
+        otwarcie nie zależy od długości łańcucha (poza migracją bez indeksu).
+        Bez fsync indeks może po awarii systemu przeżyć segment - wpisy
+        wskazujące urwane rekordy są obcinane, a skan ogona doindeksowuje to,
+        co z nich zostało.
+        """
+        count = len(self.heights)
+        segment, end = 0, 0
+        while count:
+            segment, offset = self.heights.get(count - 1)
+            try:
+                raw = self._read_at(segment, offset)
+                break
+            except IOError:
+                count -= 1
+                segment = 0
+        if count < len(self.heights):
+            print(f"Dropping {len(self.heights) - count} height index entries "
+                  f"past the last readable block in {self.directory}")
+            self.heights.truncate(count)
+        if count:
+            end = offset + RECORD_HEADER.size + len(raw)
+            # Wpis wysokości powstaje po wpisie hasha - brak hasha to uszkodzony indeks
+            if self.hashes.get(self._record_hash(raw)) != count - 1:
+                self._rebuild_hashes(count)
+        number = segment
+        while os.path.exists(segment_path(self.directory, number)):
+            path = segment_path(self.directory, number)
+            start = end if number == segment else 0
+            with open(path, "rb") as f:
+                for offset, raw in read_records(f, start):
+                    self._index(number, offset, raw)
+                    segment, end = number, offset + RECORD_HEADER.size + len(raw)
+                # Urwany rekord kończy log - dalsze segmenty nie mogą być pełne
+                if segment == number and os.fstat(f.fileno()).st_size > end:
+                    break
+            number += 1
+        # Puste segmenty za ostatnim rekordem (awaria przy rotacji)
+        number = segment + 1
+        while os.path.exists(segment_path(self.directory, number)):
+            os.remove(segment_path(self.directory, number))
+            number += 1
+        self.segments = segment + 1
+        path = segment_path(self.directory, segment)
+        self._file = open(path, "ab")
+        if self._file.tell() != end:
+            print(f"Truncating partial record in {path} at offset {end}")
+            self._file.truncate(end)
+            self._file.seek(end)
+
+    def _rebuild_hashes(self, count):
+        print(f"Rebuilding hash index in {self.directory}")
+        self.hashes.clear()
+        for height in range(count):
+            self.hashes.put(self._record_hash(self.read(height)), height)
+
+    def _sync_history(self):
+        """Dopisuje historię adresów dla bloków, których jeszcze w niej nie ma.
+
+        Blok przerwany w połowie (albo historia dłuższa niż łańcuch po
+        obcięciu ogona) oznacza przebudowę od genesis.
+        """
+        from bitscoin import Block
+        if not self.history.consistent or self.history.blocks > len(self):
+            print(f"Rebuilding address history in {self.directory}")
+            self.history.clear()
+        for height in range(self.history.blocks, len(self)):
+            self.history.add_block(height, Block.from_bytes(self.read(height)).transactions)
+
+    @staticmethod
+    def _record_hash(raw):
+        return header.BLOCK_RECORD.unpack_from(raw)[6]
+
+    def _index(self, segment, offset, raw):
+        # Najpierw hash, potem wysokość - wpis wysokości oznacza pełny blok
+        self.hashes.put(self._record_hash(raw), len(self.heights))
+        self.heights.append(segment, offset)
+
+    @property
+    def count(self):
+        return len(self.heights)
+
+    def __len__(self):
+        return len(self.heights)
+
+    def _read_at(self, segment, offset):
+        f = self._readers.get(segment)
+        if f is None:
+            f = self._readers[segment] = open(segment_path(self.directory, segment), "rb")
+        head = os.pread(f.fileno(), RECORD_HEADER.size, offset)
+        if len(head) < RECORD_HEADER.size:
+            raise IOError(f"Truncated block record in segment {segment} at {offset}")
+        length, crc = RECORD_HEADER.unpack(head)
+        raw = os.pread(f.fileno(), length, offset + RECORD_HEADER.size)
+        if len(raw) < length or zlib.crc32(raw) != crc:
+            raise IOError(f"Corrupt block record in segment {segment} at {offset}")
+        return raw
+
+    def read(self, height):
+        """Surowy rekord bloku na danej wysokości (None poza łańcuchem)"""
+        location = self.heights.get(height)
+        if location is None:
+            return None
+        return self._read_at(*location)
+
+    def height_of(self, block_hash):
+        """Wysokość bloku o danym hashu (hex albo bajty) albo None"""
+        if isinstance(block_hash, str):
+            block_hash = header.hash_to_bytes(block_hash)
+        height = self.hashes.get(block_hash)
+        if height is None or height >= len(self.heights):
+            return None
+        return height
+
+    def get_by_height(self, height):
+        from bitscoin import Block
+        raw = self.read(height)
+        return None if raw is None else Block.from_bytes(raw)
+
+    def get_by_hash(self, block_hash):
+        height = self.height_of(block_hash)
+        return None if height is None else self.get_by_height(height)
+
+    def append(self, block):
+        """Dopisuje blok, zwraca (numer segmentu, offset rekordu)"""
+        if self.readonly:
+            raise IOError(f"Block store {self.directory} is read-only")
+        raw = block.serialize()
+        record = b"".join((RECORD_HEADER.pack(len(raw), zlib.crc32(raw)), raw))
+        with self._lock:
+            if self._file.tell() and self._file.tell() + len(record) > self.segment_size:
+                self._file.close()
+                self.segments += 1
+                self._file = open(segment_path(self.directory, self.segments - 1), "ab")
+            offset = self._file.tell()
+            self._file.write(record)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._index(self.segments - 1, offset, raw)
+            self.history.add_block(len(self.heights) - 1, block.transactions)
+            return self.segments - 1, offset
+
+    def records(self, start=0):
+        """Iteruje surowe rekordy bloków od wysokości start (domyślnie genesis)"""
+        location = (0, 0) if start == 0 else self.heights.get(start)
+        if location is None:
+            return
+        segment, offset = location
+        for number in range(segment, self.segments):
+            with open(segment_path(self.directory, number), "rb") as f:
+                for _, raw in read_records(f, offset if number == segment else 0):
+                    yield raw
+
+    def __iter__(self):
+        from bitscoin import Block
+        for raw in self.records():
+            yield Block.from_bytes(raw)
+
+    def export_json(self, path):
+        """Eksport do chain.json (opcjonalny - źródłem prawdy są segmenty)"""
+        with open(path, "w") as f:
+            f.write("[")
+            for i, blk in enumerate(self):
+                f.write(",\n" if i else "\n")
+                f.write(json.dumps(blk.to_dict(), indent=2))
+            f.write("\n]\n")
+
+    def submit_transaction(self, tx_data):
+        """Dopisuje transakcję do dziennika - odbierze ją działający node"""
+        with open(os.path.join(self.directory, JOURNAL_NAME), "a") as f:
+            f.write(json.dumps(tx_data) + "\n")
+
+    def take_transactions(self):
+        """Zwraca nowe transakcje z dziennika i zapamiętuje, dokąd doczytano"""
+        journal = os.path.join(self.directory, JOURNAL_NAME)
+        marker = os.path.join(self.directory, JOURNAL_OFFSET_NAME)
+        if not os.path.exists(journal):
+            return []
+        offset = 0
+        if os.path.exists(marker):
+            with open(marker) as f:
+                offset = int(f.read() or 0)
+        txs = []
+        start = offset
+        with open(journal, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # Niedokończona linia - CLI jeszcze pisze, wrócimy po nią później
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                # Uszkodzona linia jest pomijana - inaczej blokowałaby dziennik na zawsze
+                try:
+                    txs.append(json.loads(line))
+                except ValueError as e:
+                    print(f"Skipping malformed journal line at byte {offset - len(line)}: {e}")
+        if offset != start:
+            with open(marker, "w") as f:
+                f.write(str(offset))
+        return txs
+
+    def validated(self):
+        """Wysokość ostatniego zwalidowanego bloku albo None.
+
+        Znacznik wskazujący blok spoza łańcucha albo z innym hashem (np. po
+        obcięciu urwanego ogona) jest pomijany - walidacja zacznie od nowa.
+        """
+        path = os.path.join(self.directory, VALIDATED_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            height, block_hash = f.read().split()
+        raw = self.read(int(height))
+        if raw is None or self._record_hash(raw).hex() != block_hash:
+            return None
+        return int(height)
+
+    def mark_validated(self, height):
+        """Zapisuje znacznik walidacji (atomowo - podmiana pliku)"""
+        path = os.path.join(self.directory, VALIDATED_NAME)
+        with open(path + ".tmp", "w") as f:
+            f.write(f"{height} {self._record_hash(self.read(height)).hex()}")
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for f in self._readers.values():
+                f.close()
+            self._readers.clear()
+            self.heights.close()
+            self.hashes.close()
+            self.history.close()
+
+class BlockReader:
+    """Magazyn tylko do odczytu: segmenty zmapowane mmap, bloki bez kopiowania.
+
+    view() zwraca memoryview rekordu wprost z mapy segmentu, a block()
+    owija go w Block dekodujący pola dopiero przy dostępie. Pamięć procesu
+    nie rośnie z rozmiarem czytanego zakresu - strony trzyma cache systemu.
+    """
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.heights = HeightIndex(os.path.join(self.directory, HEIGHT_INDEX_NAME), readonly=True)
+        self.hashes = HashIndex(os.path.join(self.directory, HASH_INDEX_NAME), readonly=True)
+        # Własne deskryptory na zapytanie - niezależne od plików pisanych przez node'a
+        self.history = HistoryIndex(os.path.join(self.directory, HISTORY_NAME),
+                                    os.path.join(self.directory, HISTORY_INDEX_NAME), readonly=True)
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.heights)
+
+    def _map(self, segment, end):
+        """Mapa segmentu obejmująca co najmniej [0, end) - node wciąż dopisuje"""
+        with self._lock:
+            mapped = self._maps.get(segment)
+            if mapped is None or len(mapped) < end:
+                with open(segment_path(self.directory, segment), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Stara mapa zniknie razem z ostatnim widokiem, który ją trzyma
+                self._maps[segment] = mapped
+            return mapped
+
+    def view(self, height):
+        """memoryview rekordu bloku (bez kopiowania) albo None poza łańcuchem"""
+        location = self.heights.get(height)
+        if location is None:
+            return None
+        segment, offset = location
+        mapped = self._map(segment, offset + RECORD_HEADER.size)
+        length, _ = RECORD_HEADER.unpack_from(mapped, offset)
+        start = offset + RECORD_HEADER.size
+        if len(mapped) < start + length:
+            mapped = self._map(segment, start + length)
+        return memoryview(mapped)[start:start + length]
+
+    def block(self, height):
+        from bitscoin import Block
+        view = self.view(height)
+        return None if view is None else Block.from_buffer(view)
+
+    def block_by_hash(self, block_hash):
+        if isinstance(block_hash, str):
+            block_hash = header.hash_to_bytes(block_hash)
+        height = self.hashes.get(block_hash)
+        if height is None or height >= len(self):
+            return None
+        return self.block(height)
+
+    def blocks(self, start=0, stop=None):
+        """Bloki z zakresu wysokości [start, stop), czytane leniwie"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for height in range(max(0, start), stop):
+            yield self.block(height)
+
+    def validated(self):
+        """Wysokość ostatniego zwalidowanego bloku albo None.
+
+        Znacznik wskazujący blok spoza łańcucha albo z innym hashem (np. po
+        obcięciu urwanego ogona) jest pomijany - walidacja zacznie od nowa.
+        """
+        path = os.path.join(self.directory, VALIDATED_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            height, block_hash = f.read().split()
+        view = self.view(int(height))
+        if view is None or BlockStore._record_hash(view).hex() != block_hash:
+            return None
+        return int(height)
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                try:
+                    mapped.close()
+                except BufferError:
+                    # Ktoś wciąż trzyma widok - mapę zamknie GC
+                    pass
+            self._maps.clear()
+        self.heights.close()
+        self.hashes.close()
+        self.history.close()
+
+def iter_chain_json(path, chunk_size=64 * 1024):
+    """Strumieniowo czyta chain.json - słownik bloku po słowniku.
+
+    W pamięci jest tylko bieżący fragment pliku (najwyżej jeden blok
+    dłuższy), a nie cały dokument, więc czytanie ogromnego łańcucha ma
+    stały koszt pamięci. Błąd składni zgłaszany jest z offsetem w bajtach.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos = "", 0
+        # Bajty pliku przed początkiem buf
+        base = 0
+        started = False
+        while True:
+            # Pomiń białe znaki i przecinki między blokami
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                base += len(buf.encode("utf-8"))
+                buf, pos = f.read(chunk_size), 0
+                if not buf:
+                    raise ValueError(f"{path}: unexpected end of chain file")
+                continue
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"{path}: chain file must be a JSON list")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                block, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Blok ucięty na granicy fragmentu (błąd na samym końcu bufora
+                # albo niedomknięty napis) - doczytaj i spróbuj ponownie
+                truncated = (len(buf) - e.pos <= 16 or
+                             e.msg.startswith("Unterminated string"))
+                more = f.read(chunk_size) if truncated else ""
+                if not more:
+                    offset = base + len(buf[:e.pos].encode("utf-8"))
+                    raise ValueError(f"{path}: {e.msg} at byte {offset}") from e
+                base += len(buf[:pos].encode("utf-8"))
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield block
+            pos = end
+
+def import_chain_json(store, path):
+    """Przenosi stary chain.json do magazynu bloków, blok po bloku"""
+    from bitscoin import Block
+    count = 0
+    for d in iter_chain_json(path):
+        store.append(Block.from_dict(d))
+        count += 1
+    return count
+
+def read_chain(path):
+    """Bloki (Block) z katalogu magazynu albo z pliku chain.json"""
+    if os.path.isdir(path):
+        store = BlockStore(path, readonly=True)
+        try:
+            yield from store
+        finally:
+            store.close()
+    else:
+        from bitscoin import Block
+        for d in iter_chain_json(path):
+            yield Block.from_dict(d)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Szablon Bloku
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import heapq
+from header import LENGTH
+
+# Budżet treści bloku; część zostaje na data i coinbase
+MAX_BLOCK_BYTES = 1024 * 1024
+COINBASE_RESERVE = 1024
+# Sprawdzeń podpisu na blok (jedno na transakcję poza coinbase)
+MAX_BLOCK_SIGOPS = 4000
+# Ile czekających, które się nie mieszczą, sprawdzić przy jednej zmianie
+MAX_SKIPS = 32
+
+class BlockTemplate:
+    """Wybrane transakcje i ich zakodowane bajty, gotowe do bloku"""
+    def __init__(self, transactions, tx_bytes, fees, size, sigops):
+        self.transactions = transactions
+        self.tx_bytes = tx_bytes
+        self.fees = fees
+        self.size = size
+        self.sigops = sigops
+
+class TemplateBuilder:
+    """Utrzymuje szablon bloku z mempoolu w budżecie bajtów i sigopów.
+
+    Mempool zgłasza każdą dodaną i usuniętą transakcję (added/removed).
+    Wybrane transakcje siedzą w kopcu od najgorszej opłaty za bajt,
+    czekające - w kopcu od najlepszej; zmiana przesuwa transakcje między
+    kopcami w O(log n). Szukanie mniejszych transakcji do wolnego miejsca
+    kończy się po MAX_SKIPS niepasujących, więc zmiana kosztuje
+    O((zmienione + MAX_SKIPS) log n) także przy pełnym szablonie - za cenę
+    możliwie niedobranej małej transakcji głębiej w kolejce. Bajty
+    szablonu są cache'owane i przy samych dopisaniach tylko doklejane.
+    """
+    def __init__(self, max_bytes=MAX_BLOCK_BYTES - COINBASE_RESERVE,
+                 max_sigops=MAX_BLOCK_SIGOPS):
+        self.max_bytes = max_bytes
+        self.max_sigops = max_sigops
+        self.selected = {}
+        self.waiting = {}
+        self._selected_heap = []
+        self._waiting_heap = []
+        self._seq = 0
+        self.size = self.sigops = 0
+        self.fees = 0
+        # Cache bajtów: None po usunięciu, inaczej bajty + części do doklejenia
+        self._bytes = b""
+        self._appended = []
+
+    @staticmethod
+    def _part_size(tx):
+        return LENGTH.size + tx.size
+
+    def _fits(self, tx):
+        return (self.size + self._part_size(tx) <= self.max_bytes and
+                self.sigops + tx.sigops <= self.max_sigops)
+
+    def _peek(self, heap, entries):
+        while heap and heap[0][2] not in entries:
+            heapq.heappop(heap)
+        return entries[heap[0][2]] if heap else None
+
+    def _select(self, tx):
+        del self.waiting[tx.txid]
+        self.selected[tx.txid] = tx
+        self._seq += 1
+        heapq.heappush(self._selected_heap, (tx.fee_rate, self._seq, tx.txid))
+        self.size += self._part_size(tx)
+        self.sigops += tx.sigops
+        self.fees += tx.fee
+        if self._bytes is not None:
+            self._appended.append(tx)
+
+    def _wait(self, tx):
+        self.waiting[tx.txid] = tx
+        self._seq += 1
+        heapq.heappush(self._waiting_heap, (-tx.fee_rate, self._seq, tx.txid))
+
+    def _unselect(self, tx):
+        del self.selected[tx.txid]
+        self.size -= self._part_size(tx)
+        self.sigops -= tx.sigops
+        self.fees -= tx.fee
+        self._bytes = None
+        self._appended = []
+
+    def added(self, tx):
+        """Nowa transakcja w mempoolu"""
+        self._wait(tx)
+        self._fill()
+
+    def removed(self, tx):
+        """Transakcja zniknęła z mempoolu (blok, wyrzucenie, wygaśnięcie)"""
+        if tx.txid in self.selected:
+            self._unselect(tx)
+            self._fill()
+        else:
+            self.waiting.pop(tx.txid, None)
+
+    def _fill(self):
+        """Dobiera najlepsze czekające, wypychając gorsze wybrane, gdy to pomaga"""
+        skipped = []
+        while len(skipped) < MAX_SKIPS:
+            best = self._peek(self._waiting_heap, self.waiting)
+            if best is None:
+                break
+            if self._fits(best):
+                heapq.heappop(self._waiting_heap)
+                self._select(best)
+                continue
+            worst = self._peek(self._selected_heap, self.selected)
+            if (worst is not None and worst.fee_rate < best.fee_rate and
+                    self._part_size(best) <= self.max_bytes):
+                heapq.heappop(self._selected_heap)
+                self._unselect(worst)
+                self._wait(worst)
+                continue
+            # Nie mieści się nawet kosztem gorszych - spróbuj mniejszych
+            skipped.append(heapq.heappop(self._waiting_heap))
+        for entry in skipped:
+            heapq.heappush(self._waiting_heap, entry)
+
+    def template(self):
+        """Aktualny szablon; bajty przeliczane tylko po usunięciach"""
+        if self._bytes is None:
+            self._bytes, self._appended = b"", list(self.selected.values())
+        if self._appended:
+            self._bytes += b"".join(LENGTH.pack(tx.size) + tx.encode()
+                                    for tx in self._appended)
+            self._appended = []
+        return BlockTemplate(list(self.selected.values()), self._bytes,
+                             self.fees, self.size, self.sigops)
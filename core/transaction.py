@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Transakcje
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import ast, hashlib, json
+
+class Transaction:
+    """Transakcja - niemutowalna, z kanonicznym kodowaniem i txid.
+
+    Kodowanie to JSON z posortowanymi kluczami i bez spacji, więc te same
+    pola dają zawsze te same bajty; txid to sha256 tych bajtów. Coinbase
+    (nagroda za blok) to transakcja bez nadawcy.
+
+    inputs to wydawane wyjścia [(txid, indeks)]. Wyjścia wynikają z pól:
+    0 - kwota dla odbiorcy, 1 - reszta z wejść po odjęciu opłaty (fee)
+    wraca do nadawcy. Opłaty zbiera coinbase bloku.
+
+    public_key (DER w Base58) pozwala zweryfikować podpis bez portfela -
+    jego hash musi dawać adres nadawcy.
+    """
+    __slots__ = ("sender", "recipient", "amount", "timestamp", "signature",
+                 "inputs", "fee", "public_key", "_encoded", "_txid")
+
+    def __init__(self, sender, recipient, amount, timestamp, signature=None,
+                 inputs=(), fee=0, public_key=None):
+        for name, value in (("sender", sender), ("recipient", recipient),
+                            ("amount", float(amount)), ("timestamp", timestamp),
+                            ("signature", signature),
+                            ("inputs", tuple((txid, int(i)) for txid, i in inputs)),
+                            ("fee", float(fee)), ("public_key", public_key)):
+            object.__setattr__(self, name, value)
+        encoded = json.dumps(self.to_dict(), sort_keys=True,
+                             separators=(",", ":")).encode()
+        object.__setattr__(self, "_encoded", encoded)
+        object.__setattr__(self, "_txid", hashlib.sha256(encoded).hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Transaction is immutable (cannot set {name})")
+
+    def __reduce__(self):
+        return (Transaction.decode, (self._encoded,))
+
+    def __eq__(self, other):
+        return isinstance(other, Transaction) and self._encoded == other._encoded
+
+    def __hash__(self):
+        return hash(self._encoded)
+
+    def __repr__(self):
+        return f"Transaction({self.sender} -> {self.recipient}: {self.amount}, {self.txid[:16]})"
+
+    @classmethod
+    def coinbase(cls, address, amount, timestamp):
+        """Nagroda za blok dla górnika"""
+        return cls(None, address, amount, timestamp)
+
+    @classmethod
+    def from_dict(cls, d):
+        """Transakcja ze słownika API / dziennika / chain.json"""
+        return cls(d.get("from"), d.get("to"), d.get("amount", 0),
+                   d.get("timestamp", 0), d.get("signature"), d.get("inputs", ()),
+                   d.get("fee", 0), d.get("public_key"))
+
+    def to_dict(self):
+        d = {
+            "from": self.sender,
+            "to": self.recipient,
+            "amount": self.amount,
+            "timestamp": self.timestamp,
+            "signature": self.signature
+        }
+        # Bez pustych pól - starsze transakcje zachowują kodowanie i txid
+        if self.inputs:
+            d["inputs"] = [list(outpoint) for outpoint in self.inputs]
+        if self.fee:
+            d["fee"] = self.fee
+        if self.public_key:
+            d["public_key"] = self.public_key
+        return d
+
+    def with_inputs(self, inputs):
+        """Ta sama transakcja z wybranymi wejściami (nowy txid)"""
+        return Transaction(self.sender, self.recipient, self.amount,
+                           self.timestamp, self.signature, inputs, self.fee,
+                           self.public_key)
+
+    @property
+    def cost(self):
+        """Ile płaci nadawca: kwota + opłata"""
+        return self.amount + self.fee
+
+    @property
+    def size(self):
+        """Rozmiar kanonicznego kodowania w bajtach"""
+        return len(self._encoded)
+
+    @property
+    def fee_rate(self):
+        """Opłata za bajt - priorytet w mempoolu"""
+        return self.fee / len(self._encoded)
+
+    @property
+    def sigops(self):
+        """Sprawdzenia podpisu przy weryfikacji - jedno poza coinbase"""
+        return 0 if self.is_coinbase else 1
+
+    def outputs(self, input_total=0):
+        """Wyjścia [(adres, kwota)] przy danej sumie wejść"""
+        outputs = [(self.recipient, self.amount)]
+        change = input_total - self.cost
+        if not self.is_coinbase and change > 0:
+            outputs.append((self.sender, change))
+        return outputs
+
+    @classmethod
+    def decode(cls, raw):
+        return cls.from_dict(json.loads(bytes(raw)))
+
+    def encode(self):
+        """Kanoniczne bajty transakcji (zapisywane w bloku)"""
+        return self._encoded
+
+    @property
+    def txid(self):
+        return self._txid
+
+    @property
+    def is_coinbase(self):
+        return self.sender is None
+
+    def message(self):
+        """Podpisywana treść: kanoniczny JSON wszystkich pól poza signature i inputs.
+
+        inputs dobiera węzeł już po podpisaniu (nadawca zna tylko saldo), więc
+        nie mogą być podpisane. Przed powtórzeniem chroni podpisany timestamp:
+        węzeł przyjmuje każdą podpisaną treść (signed_id) raz, w oknie ważności.
+        """
+        d = self.to_dict()
+        del d["signature"]
+        d.pop("inputs", None)
+        return json.dumps(d, sort_keys=True, separators=(",", ":"))
+
+    @property
+    def signed_id(self):
+        """Hash podpisanej treści - ten sam przed i po doborze wejść"""
+        return hashlib.sha256(self.message().encode()).hexdigest()
+
+def legacy_transactions(data, timestamp):
+    """Migracja starych bloków: transakcje z napisu data.
+
+    Stary format to "Reward to <adres>: <kwota> BSC" i opcjonalnie jeden
+    fragment " | TX {repr słownika}". Fragment jest parsowany przez
+    literal_eval, żeby dane bloku nie mogły wykonać kodu. Niepoprawne
+    fragmenty są pomijane, jak w dawnym skanie salda.
+    """
+    txs = []
+    if data.startswith("Reward to "):
+        address, sep, rest = data[len("Reward to "):].partition(": ")
+        try:
+            if sep:
+                txs.append(Transaction.coinbase(address, rest.split()[0], timestamp))
+        except (IndexError, ValueError):
+            pass
+    tx_start = data.find("TX {")
+    if tx_start >= 0:
+        try:
+            tx = ast.literal_eval(data[tx_start+3:].split("}")[0] + "}")
+            txs.append(Transaction.from_dict(tx))
+        except (ValueError, TypeError, SyntaxError, AttributeError):
+            pass
+    return txs
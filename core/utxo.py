@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Zbiór Niewydanych Wyjść (UTXO)
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import os, struct
+from header import ZERO_HASH, TX_VERSION
+
+# Pliki w katalogu magazynu bloków
+UTXO_NAME = "utxo.dat"
+UNDO_NAME = "undo.dat"
+# Zrzut: magic, liczba bloków, hash tipu, liczba adresów, liczba wyjść
+SNAPSHOT_HEADER = struct.Struct("<4sQ32sIQ")
+SNAPSHOT_MAGIC = b"BSUT"
+# Wyjście w zrzucie: txid, indeks, numer adresu z tablicy adresów, kwota
+COIN = struct.Struct("<32sIId")
+ADDRESS_LENGTH = struct.Struct("<H")
+# Rekord undo: wydane wyjścia (txid, indeks, kwota, długość adresu + adres),
+# na końcu stopka z wysokością bloku i długością rekordu
+UNDO_COIN = struct.Struct("<32sIdH")
+UNDO_FOOTER = struct.Struct("<QI")
+# Co ile bloków zrzucać zbiór na dysk (restart odtwarza najwyżej tyle bloków)
+FLUSH_INTERVAL = 100
+
+def outpoint(txid, index):
+    """Klucz wyjścia: 32 bajty txid + indeks"""
+    return bytes.fromhex(txid) + index.to_bytes(4, "little")
+
+class UtxoSet:
+    """Niewydane wyjścia kluczowane (txid, indeks).
+
+    Pamięć trzyma cały zbiór (słownik wyjść i wyjścia per adres), więc
+    sprawdzenie wydatku to O(wejść). Na dysku jest zwarty zrzut co
+    FLUSH_INTERVAL bloków i log undo z wyjściami wydanymi przez każdy
+    blok - cofnięcie bloku to odczyt ostatniego rekordu logu.
+    """
+    def __init__(self, directory=None, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.coins = {}
+        self.by_address = {}
+        # Liczba zastosowanych bloków i hash ostatniego
+        self.height = 0
+        self.tip = ZERO_HASH
+        # Stare transfery bez pokrycia przyjęte przy migracji: (wysokość, txid, brak)
+        self.anomalies = []
+        if directory is not None:
+            self._load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        """Wczytuje zrzut i obcina log undo do jego wysokości"""
+        path = self._path(UTXO_NAME)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                magic, height, tip, addresses, count = \
+                    SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+                if magic != SNAPSHOT_MAGIC:
+                    raise IOError(f"{path} is not a UTXO snapshot")
+                self.height, self.tip = height, tip
+                names = []
+                for _ in range(addresses):
+                    length, = ADDRESS_LENGTH.unpack(f.read(ADDRESS_LENGTH.size))
+                    names.append(f.read(length).decode())
+                raw = f.read(count * COIN.size)
+            for txid, index, address, amount in COIN.iter_unpack(raw):
+                self._add(txid + index.to_bytes(4, "little"), names[address], amount)
+        # Rekordy undo nowsze niż zrzut powstaną ponownie przy doganianiu łańcucha
+        with open(self._path(UNDO_NAME), "ab+") as f:
+            end = f.seek(0, os.SEEK_END)
+            while end:
+                f.seek(end - UNDO_FOOTER.size)
+                height, length = UNDO_FOOTER.unpack(f.read(UNDO_FOOTER.size))
+                if height < self.height:
+                    break
+                end -= length + UNDO_FOOTER.size
+            f.truncate(end)
+
+    def sync(self, chain):
+        """Dogania łańcuch (listę bloków); inny łańcuch niż w zrzucie - od zera.
+
+        Bloki łańcucha są już przyjęte, więc stare bloki (sprzed TX_VERSION)
+        z transferem ponad saldo nadawcy nie przerywają startu węzła - trafiają
+        do anomalies (migrate w connect_block).
+        """
+        if self.height > len(chain) or (self.height and chain[self.height - 1].hash_bytes != self.tip):
+            print("Rebuilding UTXO set")
+            self.coins.clear()
+            self.by_address.clear()
+            self.height, self.tip = 0, ZERO_HASH
+            if self.directory is not None:
+                open(self._path(UNDO_NAME), "wb").close()
+        for blk in chain[self.height:]:
+            self.connect_block(blk, flush=False, migrate=True)
+        self.flush()
+
+    def _add(self, key, address, amount):
+        self.coins[key] = (address, amount)
+        self.by_address.setdefault(address, {})[key] = amount
+
+    def _remove(self, key):
+        address, amount = self.coins.pop(key)
+        coins = self.by_address[address]
+        del coins[key]
+        if not coins:
+            del self.by_address[address]
+        return address, amount
+
+    def get(self, txid, index):
+        """(adres, kwota) niewydanego wyjścia albo None"""
+        return self.coins.get(outpoint(txid, index))
+
+    def balance(self, address, exclude=()):
+        """Suma niewydanych wyjść adresu (bez zarezerwowanych w exclude)"""
+        return sum(amount for key, amount in self.by_address.get(address, {}).items()
+                   if key not in exclude)
+
+    def select(self, address, amount, exclude=()):
+        """Najstarsze wyjścia adresu pokrywające kwotę: ([(txid, indeks)], suma)"""
+        inputs, total = [], 0
+        for key, value in self.by_address.get(address, {}).items():
+            if total >= amount:
+                break
+            if key in exclude:
+                continue
+            inputs.append((key[:32].hex(), int.from_bytes(key[32:], "little")))
+            total += value
+        return inputs, total
+
+    def check(self, tx, exclude=()):
+        """Suma wejść transakcji; ValueError gdy wejście nie istnieje, nie jest
+        nadawcy albo występuje dwa razy"""
+        total = 0
+        seen = set()
+        for txid, index in tx.inputs:
+            key = outpoint(txid, index)
+            if key in seen:
+                raise ValueError(f"Input {txid}:{index} listed twice")
+            seen.add(key)
+            coin = self.coins.get(key)
+            if coin is None or key in exclude:
+                raise ValueError(f"Input {txid}:{index} is spent or unknown")
+            if coin[0] != tx.sender:
+                raise ValueError(f"Input {txid}:{index} does not belong to {tx.sender}")
+            total += coin[1]
+        if total < tx.cost:
+            raise ValueError(f"Inputs cover {total} of {tx.cost} BSC")
+        return total
+
+    def connect_block(self, blk, flush=True, migrate=False):
+        """Stosuje blok: wydaje wejścia, dodaje wyjścia i zapisuje rekord undo.
+
+        Transakcje bez inputs w starych blokach (sprzed TX_VERSION) wydają
+        najstarsze wyjścia nadawcy; od TX_VERSION inputs są obowiązkowe.
+        Brak pokrycia w starym bloku to ValueError, a przy migrate (blok już
+        w łańcuchu) - wydanie tego, co jest, i wpis w anomalies; odbiorca
+        dostaje pełną kwotę, jak w księdze sald. Błędny blok (każdy wyjątek)
+        nie zostawia żadnych zmian.
+        """
+        spent, created, anomalies = [], [], []
+        try:
+            for tx in blk.transactions:
+                total = 0
+                if not tx.is_coinbase:
+                    if tx.inputs:
+                        self.check(tx)
+                        inputs = tx.inputs
+                    elif blk.version < TX_VERSION:
+                        inputs, selected = self.select(tx.sender, tx.cost)
+                        if selected < tx.cost:
+                            if not migrate:
+                                raise ValueError(f"Inputs cover {selected} of {tx.cost} BSC")
+                            anomalies.append((blk.index, tx.txid, tx.cost - selected))
+                    else:
+                        raise ValueError(f"Transaction {tx.txid} has no inputs")
+                    for txid, index in inputs:
+                        key = outpoint(txid, index)
+                        coin = self._remove(key)
+                        spent.append((key, coin))
+                        total += coin[1]
+                for index, (address, amount) in enumerate(tx.outputs(total)):
+                    key = outpoint(tx.txid, index)
+                    if key in self.coins:
+                        raise ValueError(f"Duplicate output {tx.txid}:{index}")
+                    self._add(key, address, amount)
+                    created.append(key)
+        except BaseException:
+            for key in reversed(created):
+                self._remove(key)
+            for key, (address, amount) in reversed(spent):
+                self._add(key, address, amount)
+            raise
+        for height, txid, missing in anomalies:
+            print(f"⚠️  Legacy transaction {txid} at height {height} "
+                  f"overspends by {missing} BSC - accepted as migrated")
+        self.anomalies += anomalies
+        if self.directory is not None:
+            self._write_undo(blk.index, spent)
+        self.height, self.tip = blk.index + 1, blk.hash_bytes
+        if flush and self.height % self.flush_interval == 0:
+            self.flush()
+
+    def _write_undo(self, height, spent):
+        parts = []
+        for key, (address, amount) in spent:
+            name = address.encode()
+            parts += (UNDO_COIN.pack(key[:32], int.from_bytes(key[32:], "little"),
+                                     amount, len(name)), name)
+        payload = b"".join(parts)
+        with open(self._path(UNDO_NAME), "ab") as f:
+            f.write(payload + UNDO_FOOTER.pack(height, len(payload)))
+
+    def disconnect_block(self, blk, prev_hash):
+        """Cofa blok z tipu: usuwa jego wyjścia i przywraca wydane z rekordu undo"""
+        if blk.index + 1 != self.height:
+            raise ValueError(f"Block {blk.index} is not the UTXO tip")
+        if self.directory is None:
+            raise ValueError("In-memory UTXO set keeps no undo records")
+        spent = []
+        with open(self._path(UNDO_NAME), "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            f.seek(end - UNDO_FOOTER.size)
+            height, length = UNDO_FOOTER.unpack(f.read(UNDO_FOOTER.size))
+            if height != blk.index:
+                raise ValueError(f"No undo record for block {blk.index}")
+            start = end - UNDO_FOOTER.size - length
+            f.seek(start)
+            payload = f.read(length)
+            f.truncate(start)
+        pos = 0
+        while pos < len(payload):
+            txid, index, amount, size = UNDO_COIN.unpack_from(payload, pos)
+            pos += UNDO_COIN.size
+            address = payload[pos:pos + size].decode()
+            pos += size
+            spent.append((txid + index.to_bytes(4, "little"), address, amount))
+        for tx in reversed(blk.transactions):
+            # Wyjście 0 - odbiorca, 1 - reszta (jeśli była)
+            for index in (0, 1):
+                key = outpoint(tx.txid, index)
+                if key in self.coins:
+                    self._remove(key)
+        for key, address, amount in spent:
+            self._add(key, address, amount)
+        self.height, self.tip = blk.index, prev_hash
+
+    def flush(self):
+        """Zapisuje zwarty zrzut zbioru (atomowo - podmiana pliku)"""
+        if self.directory is None:
+            return
+        names, ids = [], {}
+        coins = []
+        for key, (address, amount) in self.coins.items():
+            if address not in ids:
+                ids[address] = len(names)
+                names.append(address)
+            coins.append(COIN.pack(key[:32], int.from_bytes(key[32:], "little"),
+                                   ids[address], amount))
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.height, self.tip,
+                                      len(names), len(coins))]
+        for name in names:
+            raw = name.encode()
+            parts += (ADDRESS_LENGTH.pack(len(raw)), raw)
+        parts += coins
+        path = self._path(UTXO_NAME)
+        with open(path + ".tmp", "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(path + ".tmp", path)
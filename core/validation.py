@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Projekt BitsCoin 2025 - Walidacja Łańcucha
+ * Autorzy: Grupa Siedemtrzy
+ * Fork SHA-256 – niezależna sieć BitsCoin
+ * © 2025 Grupa Siedemtrzy. Wszelkie prawa zastrzeżone.
+ */
+"""
+
+import hashlib, os
+import multiprocessing as mp
+from collections import deque
+from itertools import islice
+from header import (BLOCK_RECORD, ZERO_HASH, MERKLE_VERSION, MIN_DIFFICULTY,
+                    record_digest, bits_to_target, difficulty_to_target, body_parts)
+from merkle import merkle_root
+
+# Rekordów na zadanie dla procesu - dość, żeby narzut IPC się rozmył
+CHUNK_SIZE = 4096
+
+# Punkty kontrolne: hash genesis sieci -> (wysokość, hash) rosnąco. Bloki do
+# ostatniego punktu obecnego w łańcuchu nie są ponownie hashowane.
+CHECKPOINTS = {
+    # Łańcuch z core/chain.json
+    "91b06f680543b30b4b95fc224b12c9cdfea55b1e2dd14136bc48868ebc7dc61d": (
+        (50, "0000d2f49d61cfb7173b18475eca557cbef0556a89e09099ced8d2deb1e18ff0"),
+        (94, "0000c8c96bd98ef537f91dbac29dd115b1ac529e787c40789f60dc9c23836003"),
+    ),
+}
+
+class ValidationResult:
+    """Wynik walidacji: liczba sprawdzonych bloków od start i pierwszy błędny"""
+    def __init__(self, checked, invalid_height=None, reason=None, start=0):
+        self.checked = checked
+        self.invalid_height = invalid_height
+        self.reason = reason
+        # Wysokość, od której hashowano (niżej: punkt kontrolny albo znacznik)
+        self.start = start
+
+    @property
+    def valid(self):
+        return self.invalid_height is None
+
+    def __repr__(self):
+        if self.valid:
+            return f"ValidationResult(valid, {self.checked} blocks from {self.start})"
+        return f"ValidationResult(invalid at {self.invalid_height}: {self.reason})"
+
+def _check_chunk(records, height, legacy_target, max_target):
+    """Worker: przelicza hashe paczki i sprawdza ją w jednym przejściu.
+
+    Ciągłość jest sprawdzana wewnątrz paczki; previous_hash pierwszego
+    bloku wraca do procesu głównego, który łączy paczki między sobą.
+    """
+    first_prev = BLOCK_RECORD.unpack_from(records[0])[2]
+    digests = b"".join(map(record_digest, records))
+    invalid, last = _check(records, digests, height, first_prev, legacy_target,
+                           max_target)
+    return first_prev, len(records), invalid, last
+
+def _check(records, digests, height, prev_hash, legacy_target, max_target):
+    """Hash, korzeń Merkle, ciągłość i PoW kolejnych rekordów względem przeliczonych hashy.
+
+    PoW liczy się względem bits bloku, więc bits nie może deklarować targetu
+    powyżej max_target (minimalnej difficulty sieci).
+
+    Zwraca (wysokość, powód) pierwszego błędnego bloku albo (None, hash
+    ostatniego bloku).
+    """
+    targets = {0: legacy_target}
+    for i, raw in enumerate(records):
+        version, index, prev, _, bits, _, stored = BLOCK_RECORD.unpack_from(raw)
+        digest = digests[32 * i:32 * i + 32]
+        if index != height:
+            return height, f"index {index} at height {height}"
+        if digest != stored:
+            return height, "hash mismatch"
+        if version >= MERKLE_VERSION and not _merkle_matches(raw):
+            return height, "merkle root mismatch"
+        if prev != prev_hash:
+            return height, "previous_hash does not link"
+        # Genesis nie jest kopany; bloki sprzed wersji 3 nie mają bits (0)
+        target = targets.get(bits)
+        if target is None:
+            target = targets[bits] = bits_to_target(bits)
+        if height and target > max_target:
+            return height, "target below the minimum difficulty"
+        if height and int.from_bytes(digest, "big") > target:
+            return height, "insufficient proof of work"
+        prev_hash = stored
+        height += 1
+    return None, prev_hash
+
+def _merkle_matches(raw):
+    """Czy korzeń z nagłówka zgadza się z transakcjami w treści"""
+    start = BLOCK_RECORD.size
+    parts = body_parts(raw, start + 32)
+    next(parts, None)
+    root = merkle_root(hashlib.sha256(tx).digest() for tx in parts)
+    return root == bytes(raw[start:start + 32])
+
+def _tasks(records, size, height, legacy_target, max_target):
+    """Paczki rekordów z wysokością pierwszego bloku"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk, height, legacy_target, max_target
+        height += len(chunk)
+
+def validate_records(records, workers=None, chunk_size=CHUNK_SIZE, height=0,
+                     prev_hash=ZERO_HASH, legacy_difficulty=4,
+                     min_difficulty=MIN_DIFFICULTY):
+    """Waliduje ciąg kanonicznych rekordów bloków od podanej wysokości.
+
+    Procesy puli przeliczają hashe i sprawdzają paczki po chunk_size
+    rekordów, a proces główny łączy wyniki w kolejności wysokości - robi
+    O(1) na paczkę, więc czas skaluje się z liczbą rdzeni. W locie są
+    najwyżej 2 paczki na proces, pamięć nie rośnie z długością łańcucha.
+    legacy_difficulty to target dla bloków bez pola bits (stary chain.json),
+    a min_difficulty - najłatwiejszy target, jaki może zadeklarować bits.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = _tasks(records, chunk_size, height, difficulty_to_target(legacy_difficulty),
+                   difficulty_to_target(min_difficulty))
+    start = height
+    if workers == 1:
+        results = (_check_chunk(*task) for task in tasks)
+        pool = None
+    else:
+        pool = mp.Pool(workers)
+        results = _ordered(pool, tasks, 2 * workers)
+    try:
+        for first_prev, count, invalid, last in results:
+            if first_prev != prev_hash:
+                return ValidationResult(height - start, height,
+                                        "previous_hash does not link", start)
+            if invalid is not None:
+                return ValidationResult(invalid - start, invalid, last, start)
+            prev_hash = last
+            height += count
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return ValidationResult(height - start, start=start)
+
+def _ordered(pool, tasks, window):
+    """Wyniki paczek w kolejności, z ograniczoną liczbą zadań w locie"""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(_check_chunk, task))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def validate_store(store, workers=None, checkpoints=CHECKPOINTS, **kwargs):
+    """Waliduje magazyn bloków od ostatniego zaufanego punktu.
+
+    Start to blok za ostatnim punktem kontrolnym sieci (hash na jego
+    wysokości musi się zgadzać) albo za znacznikiem "validated" magazynu,
+    zależnie co dalej. Po walidacji znacznik przesuwa się na ostatni
+    poprawny blok, więc restart sprawdza tylko bloki dopisane od tego czasu.
+    """
+    count = len(store)
+    if not count:
+        return ValidationResult(0)
+    start = 0
+    genesis = store.get_by_height(0).hash
+    for height, block_hash in checkpoints.get(genesis, ()):
+        if height >= count:
+            break
+        if store.get_by_height(height).hash != block_hash:
+            return ValidationResult(0, height, "checkpoint mismatch")
+        start = height + 1
+    validated = store.validated()
+    if validated is not None:
+        start = max(start, validated + 1)
+    prev_hash = store.get_by_height(start - 1).hash_bytes if start else ZERO_HASH
+    result = validate_records(store.records(start), workers, height=start,
+                              prev_hash=prev_hash, **kwargs)
+    last = start + result.checked - 1
+    if not store.readonly and last >= 0 and last != validated:
+        store.mark_validated(last)
+    return result
@@ -13,11 +13,68 @@ import hashlib
 import secrets
 import json
 import os
+import time
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ed25519
 from cryptography.hazmat.backends import default_backend
 import base58
 
+# Typy kluczy i bajt wersji adresu - typ klucza widać z samego adresu
+KEY_RSA = "rsa"
+KEY_ED25519 = "ed25519"
+ADDRESS_VERSIONS = {
+    KEY_RSA: 0x42,      # 'B' - adresy RSA-2048 sprzed Ed25519
+    KEY_ED25519: 0x45,
+}
+# Ed25519: szybkie generowanie i podpis, 64-bajtowe podpisy
+DEFAULT_KEY_TYPE = KEY_ED25519
+
+_PSS = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+
+def key_type_of(address):
+    """Typ klucza adresu z bajtu wersji; ValueError dla nieznanego"""
+    raw = base58.b58decode(address)
+    for key_type, version in ADDRESS_VERSIONS.items():
+        if raw[:1] == bytes([version]):
+            return key_type
+    raise ValueError(f"Unknown address version in {address}")
+
+def sign_message(private_key, message):
+    """Podpis kluczem dowolnego typu (RSA - PSS z SHA-256)"""
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return private_key.sign(message)
+    return private_key.sign(message, _PSS, hashes.SHA256())
+
+def verify_message(public_key, signature, message):
+    """Weryfikacja podpisu; InvalidSignature gdy się nie zgadza"""
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        public_key.verify(signature, message)
+    else:
+        public_key.verify(signature, message, _PSS, hashes.SHA256())
+
+def address_from_der(pub_bytes, key_type=KEY_RSA):
+    """Adres BitsCoin z klucza publicznego w DER (SubjectPublicKeyInfo)"""
+    # SHA-256 hash
+    sha256_hash = hashlib.sha256(pub_bytes).digest()
+    
+    # RIPEMD-160 hash (symulacja - używamy SHA-256 ponownie)
+    ripemd_hash = hashlib.sha256(sha256_hash).digest()[:20]
+    
+    # Prefix wersji zależny od typu klucza (0x42 = 'B' dla RSA)
+    versioned = bytes([ADDRESS_VERSIONS[key_type]]) + ripemd_hash
+    
+    # Podwójny SHA-256 dla checksum
+    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
+    
+    # Pełny adres
+    full_address = versioned + checksum
+    
+    # Kodowanie Base58
+    return base58.b58encode(full_address).decode('utf-8')
+
 class BitsCoinWallet:
     def __init__(self, wallet_dir="~/.bitscoin"):
         self.wallet_dir = os.path.expanduser(wallet_dir)
@@ -26,45 +83,34 @@ class BitsCoinWallet:
         self.keys = {}
         self.load_wallet()
     
-    def generate_keypair(self):
-        """Generuje parę kluczy RSA"""
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend()
-        )
+    def generate_keypair(self, key_type=DEFAULT_KEY_TYPE):
+        """Generuje parę kluczy Ed25519 albo RSA"""
+        if key_type == KEY_ED25519:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        elif key_type == KEY_RSA:
+            private_key = rsa.generate_private_key(
+                public_exponent=65537,
+                key_size=2048,
+                backend=default_backend()
+            )
+        else:
+            raise ValueError(f"Unknown key type {key_type}")
         public_key = private_key.public_key()
         return private_key, public_key
     
     def create_address(self, public_key):
         """Tworzy adres BitsCoin z klucza publicznego"""
+        key_type = KEY_ED25519 if isinstance(public_key, ed25519.Ed25519PublicKey) else KEY_RSA
         # Serializuj klucz publiczny
         pub_bytes = public_key.public_bytes(
             encoding=serialization.Encoding.DER,
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
-        
-        # SHA-256 hash
-        sha256_hash = hashlib.sha256(pub_bytes).digest()
-        
-        # RIPEMD-160 hash (symulacja - używamy SHA-256 ponownie)
-        ripemd_hash = hashlib.sha256(sha256_hash).digest()[:20]
-        
-        # Dodaj prefix dla BitsCoin (0x42 = 'B')
-        versioned = b'\x42' + ripemd_hash
-        
-        # Podwójny SHA-256 dla checksum
-        checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-        
-        # Pełny adres
-        full_address = versioned + checksum
-        
-        # Kodowanie Base58
-        return base58.b58encode(full_address).decode('utf-8')
+        return address_from_der(pub_bytes, key_type)
     
-    def create_new_address(self, label=""):
+    def create_new_address(self, label="", key_type=DEFAULT_KEY_TYPE):
         """Tworzy nowy adres w portfelu"""
-        private_key, public_key = self.generate_keypair()
+        private_key, public_key = self.generate_keypair(key_type)
         address = self.create_address(public_key)
         
         # Zapisz klucze
@@ -83,6 +129,7 @@ class BitsCoinWallet:
             "private_key": private_pem,
             "public_key": public_pem,
             "label": label,
+            "key_type": key_type,
             "created": int(time.time())
         }
         
@@ -101,18 +148,26 @@ class BitsCoinWallet:
             backend=default_backend()
         )
         
-        # Podpisz wiadomość
-        signature = private_key.sign(
-            message.encode('utf-8'),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        # Podpisz wiadomość (typ klucza wynika z zapisanego PEM)
+        signature = sign_message(private_key, message.encode('utf-8'))
         
         return base58.b58encode(signature).decode('utf-8')
     
+    def export_public_key(self, address):
+        """Klucz publiczny adresu (DER w Base58) - dołączany do transakcji"""
+        if address not in self.keys:
+            raise ValueError(f"Address {address} not found in wallet")
+        
+        public_key = serialization.load_pem_public_key(
+            self.keys[address]["public_key"].encode('utf-8'),
+            backend=default_backend()
+        )
+        pub_bytes = public_key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        return base58.b58encode(pub_bytes).decode('utf-8')
+    
     def verify_signature(self, address, message, signature):
         """Weryfikuje podpis transakcji"""
         try:
@@ -127,15 +182,7 @@ class BitsCoinWallet:
             
             # Zweryfikuj podpis
             sig_bytes = base58.b58decode(signature)
-            public_key.verify(
-                sig_bytes,
-                message.encode('utf-8'),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            verify_message(public_key, sig_bytes, message.encode('utf-8'))
             return True
         except:
             return False
@@ -173,8 +220,6 @@ class BitsCoinWallet:
 
 # Test functionality
 if __name__ == "__main__":
-    import time
-    
     print("=== BitsCoin Wallet System Test ===")
     
     # Stwórz portfel
@@ -12,27 +12,36 @@
 import sys, os
 # Dodaj katalog projektu (bitscoin2025) do ścieżki modułów Pythona
 sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..", "core")))
 
 import time
 import threading
-import json
-from core.bitscoin import Blockchain
+from bitscoin import Blockchain
+from storage import BlockStore, DEFAULT_DIR
 
 # Lista pracowników (miner IDs). Możesz tu dodać swoje identyfikatory.
 workers = ["miner1", "miner2", "miner3"]
 
 def pool_mine(bc):
+    if not bc.extendable:
+        print(f"[Pool] Łańcuch jest błędny ({bc.validation}) - pool nie kopie")
+        return
     idx = 0
     while True:
         miner = workers[idx % len(workers)]
         blk, t = bc.add_block(miner)
+        if blk is None:
+            # Nowy tip w trakcie kopania - ten sam miner startuje od nowa
+            continue
         print(f"[Pool] {miner} wykopał blok #{blk.index} w {t}s, hash={blk.hash}")
+        print(f"[Pool] hashe per worker: {bc.last_mining_result.hashes}")
         idx += 1
         time.sleep(0.1)  # krótka przerwa między zadaniami
 
 if __name__ == "__main__":
-    # Inicjalizacja łańcucha z difficulty=4, reward=50
-    bc = Blockchain(difficulty=4, reward=50)
+    # Inicjalizacja łańcucha z difficulty=4 (startowa), reward=50, blok co ~10s
+    bc = Blockchain(difficulty=4, reward=50, block_time=10,
+                    store=BlockStore(DEFAULT_DIR), validate=True)
     print("Uruchamiam pool… Ctrl+C aby zatrzymać")
     # Start wątku miningowego
     threading.Thread(target=pool_mine, args=(bc,), daemon=True).start()
@@ -40,9 +49,9 @@ if __name__ == "__main__":
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
+        bc.cancel_mining()
         print("\nPool zatrzymany.")
-        # Zapisz finalny chain do core/chain.json
+        # Bloki są już w core/blocks - chain.json to tylko eksport
         chain_path = os.path.abspath(os.path.join(__file__, "..", "..", "core", "chain.json"))
-        with open(chain_path, "w") as f:
-            json.dump([b.__dict__ for b in bc.chain], f, indent=2)
-        print(f"Chain zapisany do {chain_path}")
+        bc.store.export_json(chain_path)
+        print(f"Chain wyeksportowany do {chain_path}")
@@ -5,7 +5,7 @@ BitsCoin 2025 - Modern Web API
 Flask REST API for BitsCoin blockchain
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
 from flask_socketio import SocketIO
 import sys
@@ -13,11 +13,14 @@ import os
 import json
 import time
 import threading
+from functools import lru_cache
 
 # Dodaj ścieżkę do core
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
-from wallet import BitsCoinWallet
+from wallet import BitsCoinWallet, ADDRESS_VERSIONS, DEFAULT_KEY_TYPE
 from bitscoin import Blockchain
+from transaction import Transaction
+from storage import BlockStore, BlockReader, DEFAULT_DIR, import_chain_json
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'bitscoin-2025-secret'
@@ -26,23 +29,36 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Globalne zmienne
 blockchain = None
+block_reader = None
 wallet = None
 mining_active = False
 mining_thread = None
 
 def init_bitscoin():
     """Inicjalizacja BitsCoin"""
-    global blockchain, wallet
-    blockchain = Blockchain(difficulty=4, reward=50)
-    wallet = BitsCoinWallet()
+    global blockchain, block_reader, wallet
+    workers = int(os.environ.get('BITSCOIN_MINING_WORKERS', 0)) or None
+    block_time = float(os.environ.get('BITSCOIN_BLOCK_TIME', 10))
+    blocks_dir = os.environ.get('BITSCOIN_BLOCKS_DIR', DEFAULT_DIR)
+    store = BlockStore(blocks_dir)
     
-    # Załaduj istniejący blockchain jeśli istnieje
-    try:
-        with open('../core/chain.json', 'r') as f:
-            chain_data = json.load(f)
-        print(f"Loaded existing blockchain with {len(chain_data)} blocks")
-    except:
-        print("No existing blockchain found, using fresh chain")
+    # Pusty magazyn - przenieś istniejący chain.json (strumieniowo, blok po bloku)
+    chain_json = os.path.join(os.path.dirname(__file__), '..', 'core', 'chain.json')
+    if not len(store) and os.path.exists(chain_json):
+        try:
+            count = import_chain_json(store, chain_json)
+            print(f"Imported {count} blocks from {chain_json}")
+        except ValueError as e:
+            print(f"Could not import {chain_json}: {e}")
+    
+    blockchain = Blockchain(difficulty=4, reward=50, workers=workers,
+                            block_time=block_time, store=store, validate=True)
+    # Odczyty API idą przez mmap, bez kopiowania bloków z pamięci node'a
+    block_reader = BlockReader(blocks_dir)
+    print(f"Block store {blocks_dir}: {len(blockchain.chain)} blocks")
+    if blockchain.validation is not None:
+        print(f"Chain validation: {blockchain.validation}")
+    wallet = BitsCoinWallet()
 
 @app.route('/api/status')
 def api_status():
@@ -52,7 +68,11 @@ def api_status():
         'blockchain': {
             'blocks': len(blockchain.chain) if blockchain else 0,
             'difficulty': blockchain.difficulty if blockchain else 0,
-            'reward': blockchain.reward if blockchain else 0
+            'reward': blockchain.reward if blockchain else 0,
+            'block_time': blockchain.retargeter.block_time if blockchain and blockchain.retargeter else None,
+            'mining_workers': blockchain.miner.workers if blockchain else 0,
+            'mempool': len(blockchain.mempool) if blockchain else 0,
+            'signature_cache': blockchain.signature_stats() if blockchain else None
         },
         'wallet': {
             'addresses': len(wallet.get_addresses()) if wallet else 0
@@ -68,7 +88,7 @@ def api_wallet_addresses():
     
     addresses = []
     for addr in wallet.get_addresses():
-        balance = blockchain.get_balance(addr) if blockchain else 0
+        balance = blockchain.balance(addr) if blockchain else 0
         addresses.append({
             'address': addr,
             'balance': balance,
@@ -86,9 +106,13 @@ def api_create_address():
     
     data = request.get_json()
     label = data.get('label', f'Address {len(wallet.get_addresses()) + 1}')
+    # Typ klucza: ed25519 (domyślnie) albo rsa
+    key_type = data.get('key_type', DEFAULT_KEY_TYPE)
+    if key_type not in ADDRESS_VERSIONS:
+        return jsonify({'error': 'Unknown key type'}), 400
     
     try:
-        new_address = wallet.create_new_address(label)
+        new_address = wallet.create_new_address(label, key_type)
         socketio.emit('new_address', {
             'address': new_address,
             'label': label,
@@ -98,7 +122,8 @@ def api_create_address():
         return jsonify({
             'success': True,
             'address': new_address,
-            'label': label
+            'label': label,
+            'key_type': key_type
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -109,7 +134,7 @@ def api_balance(address):
     if not blockchain:
         return jsonify({'error': 'Blockchain not initialized'}), 500
     
-    balance = blockchain.get_balance(address)
+    balance = blockchain.balance(address)
     return jsonify({
         'address': address,
         'balance': balance
@@ -125,13 +150,16 @@ def api_send_transaction():
     from_addr = data.get('from')
     to_addr = data.get('to')
     amount = float(data.get('amount', 0))
+    # Opłata ustala priorytet w mempoolu (opłata za bajt)
+    fee = float(data.get('fee', 0))
     
     # Walidacja
     if from_addr not in wallet.get_addresses():
         return jsonify({'error': 'Address not in wallet'}), 400
     
-    balance = blockchain.get_balance(from_addr)
-    if balance < amount:
+    # Niewydane wyjścia minus zarezerwowane przez oczekujące transakcje
+    balance = blockchain.spendable(from_addr)
+    if balance < amount + fee:
         return jsonify({'error': 'Insufficient funds'}), 400
     
     try:
@@ -140,22 +168,23 @@ def api_send_transaction():
             "from": from_addr,
             "to": to_addr,
             "amount": amount,
+            "fee": fee,
             "timestamp": time.time()
         }
         
         # Podpis transakcji
-        tx_message = f"{from_addr}->{to_addr}:{amount}"
+        # Klucz publiczny w transakcji - węzeł weryfikuje podpis bez portfela
+        tx_data["public_key"] = wallet.export_public_key(from_addr)
+        tx_message = Transaction.from_dict(tx_data).message()
         signature = wallet.sign_transaction(from_addr, tx_message)
         tx_data["signature"] = signature
         
-        # Dodaj do ostatniego bloku
-        if len(blockchain.chain) > 0:
-            current_data = blockchain.chain[-1].data
-            blockchain.chain[-1].data = f"{current_data} | TX {tx_data}"
-        
-        # Zapisz blockchain
-        with open("../core/chain.json", "w") as f:
-            json.dump([b.__dict__ for b in blockchain.chain], f, indent=2)
+        # Bloki są niemutowalne - transakcja trafi do następnego bloku;
+        # wejścia są rezerwowane, więc równoległa wysyłka nie wyda ich drugi raz
+        try:
+            tx = blockchain.submit_transaction(tx_data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Wyślij update przez WebSocket
         socketio.emit('transaction', {
@@ -167,7 +196,9 @@ def api_send_transaction():
         
         return jsonify({
             'success': True,
-            'transaction': tx_data
+            'transaction': tx.to_dict(),
+            'txid': tx.txid,
+            'pending': True
         })
         
     except Exception as e:
@@ -176,21 +207,140 @@ def api_send_transaction():
 @app.route('/api/blockchain')
 def api_blockchain():
     """Pobierz dane blockchain"""
-    if not blockchain:
+    if not block_reader:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
+    
+    # ?start=&limit= - zakres wysokości, domyślnie cały łańcuch
+    start = request.args.get('start', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    stop = None if limit is None else start + limit
+    
+    def stream():
+        # Bloki idą prosto z mmap do odpowiedzi, jeden po drugim
+        yield '{"blocks": ['
+        for i, block in enumerate(block_reader.blocks(start, stop)):
+            yield (',' if i else '') + json.dumps(block_json(block))
+        yield ']}'
+    
+    return Response(stream(), mimetype='application/json')
+
+def block_json(block):
+    """Blok w formacie odpowiedzi API"""
+    return {
+        'index': block.index,
+        'hash': block.hash,
+        'previous_hash': block.previous_hash,
+        'timestamp': block.timestamp,
+        'data': block.data,
+        'nonce': block.nonce,
+        'bits': block.bits,
+        'merkle_root': block.merkle_root.hex() if block.merkle_root else None,
+        'transactions': [dict(tx.to_dict(), txid=tx.txid) for tx in block.transactions]
+    }
+
+@app.route('/api/block/<int:height>')
+def api_block_by_height(height):
+    """Blok po wysokości - odczyt z indeksu magazynu"""
+    if not block_reader:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
+    
+    block = block_reader.block(height)
+    if block is None:
+        return jsonify({'error': 'Block not found'}), 404
+    return jsonify(block_json(block))
+
+@app.route('/api/block/hash/<block_hash>')
+def api_block_by_hash(block_hash):
+    """Blok po hashu - odczyt z indeksu magazynu"""
+    if not block_reader:
         return jsonify({'error': 'Blockchain not initialized'}), 500
     
-    blocks = []
-    for block in blockchain.chain:
-        blocks.append({
-            'index': block.index,
-            'hash': block.hash,
-            'previous_hash': block.previous_hash,
-            'timestamp': block.timestamp,
-            'data': block.data,
-            'nonce': block.nonce
+    try:
+        block = block_reader.block_by_hash(block_hash)
+    except ValueError:
+        return jsonify({'error': 'Invalid block hash'}), 400
+    if block is None:
+        return jsonify({'error': 'Block not found'}), 404
+    return jsonify(block_json(block))
+
+@lru_cache(maxsize=64)
+def merkle_tree(height, block_hash):
+    """Drzewo Merkle bloku - poziomy zapamiętane dla kolejnych dowodów"""
+    return block_reader.block(height).merkle_tree()
+
+@app.route('/api/block/<int:height>/proof/<txid>')
+def api_merkle_proof(height, txid):
+    """Dowód przynależności transakcji do bloku (lekki klient/eksplorator)"""
+    if not block_reader:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
+    
+    block = block_reader.block(height)
+    if block is None:
+        return jsonify({'error': 'Block not found'}), 404
+    if block.merkle_root is None:
+        return jsonify({'error': 'Block has no merkle root'}), 400
+    try:
+        leaf = bytes.fromhex(txid)
+    except ValueError:
+        return jsonify({'error': 'Invalid txid'}), 400
+    tree = merkle_tree(height, block.hash)
+    try:
+        position = tree.levels[0].index(leaf)
+    except ValueError:
+        return jsonify({'error': 'Transaction not in block'}), 404
+    return jsonify({
+        'height': height,
+        'block_hash': block.hash,
+        # Nagłówek bez nonce'a: hash bloku = sha256(header + nonce <Q)
+        'header': block.header_prefix().hex(),
+        'merkle_root': block.merkle_root.hex(),
+        'txid': txid,
+        'position': position,
+        'proof': [sibling.hex() for sibling in tree.proof(position)]
+    })
+
+@app.route('/api/address/<address>/history')
+def api_address_history(address):
+    """Historia adresu od najnowszych, stronicowana kursorem"""
+    if not block_reader:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
+    
+    cursor = request.args.get('cursor', None, type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    try:
+        entries, next_cursor = block_reader.history.page(address, cursor, limit)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    history = []
+    for height, position, delta in entries:
+        tx = block_reader.block(height).transactions[position]
+        history.append({
+            'height': height,
+            'position': position,
+            'txid': tx.txid,
+            'delta': delta,
+            'timestamp': tx.timestamp
         })
+    return jsonify({'address': address, 'history': history, 'next_cursor': next_cursor})
+
+@app.route('/api/blockchain/export', methods=['POST'])
+def api_export_blockchain():
+    """Eksport łańcucha do chain.json"""
+    if not blockchain:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
     
-    return jsonify({'blocks': blocks})
+    path = os.path.join(os.path.dirname(__file__), '..', 'core', 'chain.json')
+    blockchain.store.export_json(path)
+    return jsonify({'success': True, 'path': os.path.abspath(path)})
+
+@app.route('/api/mining/stats')
+def api_mining_stats():
+    """Telemetria miningu"""
+    if not blockchain:
+        return jsonify({'error': 'Blockchain not initialized'}), 500
+    
+    return jsonify(blockchain.mining_stats())
 
 @app.route('/api/mining/start', methods=['POST'])
 def api_start_mining():
@@ -205,13 +355,23 @@ def api_start_mining():
     
     if miner_address not in wallet.get_addresses():
         return jsonify({'error': 'Invalid miner address'}), 400
+    if not blockchain.extendable:
+        return jsonify({'error': f'Chain is invalid: {blockchain.validation}'}), 400
+    
+    # Token sprzed startu wątku - stop w dowolnym momencie przerwie zadanie
+    token = blockchain.mining_token()
+    mining_active = True
     
     def mine():
         global mining_active
-        mining_active = True
-        while mining_active:
+        # Stary wątek po stop + start ma nieważny token - nie kopie w tle
+        while mining_active and not blockchain.mining_cancelled(token):
             try:
-                block, mining_time = blockchain.add_block(miner_address)
+                block, mining_time = blockchain.add_block(miner_address, token)
+                if block is None:
+                    # Zadanie przerwane (stop albo nowy tip) - pętla sprawdzi flagę
+                    continue
+                result = blockchain.last_mining_result
                 
                 # Wyślij update przez WebSocket
                 socketio.emit('new_block', {
@@ -219,13 +379,10 @@ def api_start_mining():
                     'hash': block.hash,
                     'reward': blockchain.reward,
                     'miner': miner_address,
-                    'time': mining_time
+                    'time': mining_time,
+                    'hashes': result.hashes
                 })
                 
-                # Zapisz blockchain
-                with open("../core/chain.json", "w") as f:
-                    json.dump([b.__dict__ for b in blockchain.chain], f, indent=2)
-                
             except Exception as e:
                 print(f"Mining error: {e}")
                 break
@@ -240,6 +397,8 @@ def api_stop_mining():
     """Zatrzymaj mining"""
     global mining_active
     mining_active = False
+    if blockchain:
+        blockchain.cancel_mining()
     return jsonify({'success': True, 'mining': False})
 
 @app.route('/')